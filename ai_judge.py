@@ -11,43 +11,500 @@ import base64
 from scipy.fft import fft2, fftshift
 from sklearn.cluster import KMeans
 import warnings
+import hashlib
+import json
+import threading
+import weakref
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from dataclasses import dataclass
+from types import MappingProxyType
+from judge_cache import judge_cache
 warnings.filterwarnings('ignore')
 
-class AIImageJudge:
+# Bump whenever an analyzer's scoring changes, so cached criteria are recomputed
+ANALYZER_VERSION = 1
+
+# Concurrent judge requests served by the Gradio queue (one per core by default)
+JUDGE_CONCURRENCY = int(os.getenv("JUDGE_CONCURRENCY", os.cpu_count() or 1))
+# Threads shared by parallel judge calls for fanning out analyzers
+ANALYZER_WORKERS = int(os.getenv("JUDGE_ANALYZER_WORKERS", os.cpu_count() or 1))
+# Worker processes used by judge_batch
+BATCH_WORKERS = int(os.getenv("JUDGE_BATCH_WORKERS", os.cpu_count() or 1))
+# Batch workers are started from a clean server process, never forked from a
+# multithreaded app (Gradio, Flask); "spawn" also works where forkserver doesn't
+BATCH_START_METHOD = os.getenv("JUDGE_BATCH_START_METHOD", "forkserver")
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tif', '.tiff', '.gif')
+
+# Analysis resolution policies. Resolution-robust analyzers (histograms, FFT
+# ratios, LBP, symmetry, contours) run on a proxy downscaled to max_side;
+# resolution-sensitive ones (noise residual, 8x8 DCT grid, pixel filters) run
+# on up to max_tiles native tile_size crops. None keeps the native image.
+# benchmarks/calibrate_resolution.py reports how scores shift under each.
+RESOLUTION_POLICIES = {
+    'native': {'max_side': None, 'tile_size': None, 'max_tiles': None},
+    'balanced': {'max_side': 1024, 'tile_size': 256, 'max_tiles': 16},
+    'fast': {'max_side': 512, 'tile_size': 256, 'max_tiles': 4},
+}
+RESOLUTION_POLICY = os.getenv("JUDGE_RESOLUTION_POLICY", "native")
+
+# Orthonormal DCT-II basis for 8x8 blocks
+DCT_8 = np.array([[np.sqrt((1 if k == 0 else 2) / 8) * np.cos(np.pi * (2*n + 1) * k / 16)
+                   for n in range(8)] for k in range(8)])
+
+def count_correlated_patches(windows, threshold=0.9, limit=None, max_patches=4096, chunk_bytes=16 * 2**20):
+    """
+    Memory-bounded equivalent of `np.sum(np.corrcoef(patches) > threshold) - P`
+    for a (rows, cols, ph, pw) grid of patch windows.
+    
+    Correlations are computed as dot products of centered, unit-norm patches,
+    one block of rows at a time, so memory is O(chunk * P) instead of O(P^2).
+    Above `max_patches`, a fixed-seed uniform sample of patches is used and
+    the pair count is scaled back up to the full population. Counting stops
+    as soon as the result is known to exceed `limit`.
+    """
+    grid_h, grid_w = windows.shape[:2]
+    total = grid_h * grid_w
+    if total > max_patches:
+        idx = np.sort(np.random.default_rng(0).choice(total, max_patches, replace=False))
+    else:
+        idx = np.arange(total)
+    sample = len(idx)
+    patches = windows[idx // grid_w, idx % grid_w].reshape(sample, -1).astype(np.float64)
+    patches -= patches.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(patches, axis=1)
+    # Constant patches have undefined correlation (NaN in corrcoef), never above threshold
+    valid = norms > 0
+    unit = patches[valid] / norms[valid, None]
+    n_valid = len(unit)
+    
+    # Ordered pairs above threshold (the diagonal counts once per valid patch),
+    # scaled from the sample to the full population
+    pair_scale = total * (total - 1) / (sample * (sample - 1)) if sample > 1 else 0
+    def estimate(count):
+        return (count - n_valid) * pair_scale + n_valid * total / sample - total
+    
+    chunk = max(1, chunk_bytes // (8 * max(n_valid, 1)))
+    count = 0
+    for start in range(0, n_valid, chunk):
+        count += np.count_nonzero(unit[start:start + chunk] @ unit.T > threshold)
+        if limit is not None and estimate(count) > limit:
+            break
+    return estimate(count)
+
+class _Memoized:
+    """
+    Lazily computed, memoized values. Safe to share between threads: each
+    value is computed once, and concurrent readers of the same key wait for it.
+    """
+    
     def __init__(self):
-        self.criteria = {
-            'pixel_consistency': 0,
-            'compression_artifacts': 0,
-            'noise_patterns': 0,
-            'edge_coherence': 0,
-            'color_distribution': 0,
-            'texture_analysis': 0,
-            'symmetry_analysis': 0,
-            'frequency_domain': 0,
-            'statistical_anomalies': 0,
-            'gan_artifacts': 0,
-            'diffusion_patterns': 0,
-            'upsampling_detection': 0
-        }
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        
+    def _memo(self, key, compute):
+        if key in self._cache:
+            return self._cache[key]
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+        return self._cache[key]
+
+class ImageAnalysisContext(_Memoized):
+    """
+    Per-image intermediates shared by the analyzers, computed lazily and
+    memoized. max_side, tile_size and max_tiles set the resolution policy
+    behind the proxy and native views (see RESOLUTION_POLICIES).
+    """
+    
+    def __init__(self, image, max_side=None, tile_size=None, max_tiles=None):
+        super().__init__()
+        self.image = image
+        self.max_side = max_side
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+    
+    @property
+    def proxy(self):
+        """Context for resolution-robust statistics: the image downscaled to max_side"""
+        def compute():
+            h, w = self.array.shape[:2]
+            if not self.max_side or max(h, w) <= self.max_side:
+                return self
+            scale = self.max_side / max(h, w)
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            return ImageAnalysisContext(cv2.resize(self.array, size, interpolation=cv2.INTER_AREA))
+        return self._memo('proxy', compute)
+    
+    @property
+    def native(self):
+        """
+        View for resolution-sensitive statistics: this context when the image
+        fits in max_tiles tiles, otherwise a grid of native-resolution tiles
+        spread over the image, aligned to the 8x8 block grid.
+        """
+        def compute():
+            h, w = self.array.shape[:2]
+            if not self.tile_size or not self.max_tiles or h * w <= self.max_tiles * self.tile_size**2:
+                return self
+            t = max(8, min(self.tile_size, h, w) // 8 * 8)
+            ny = min(max(1, round(np.sqrt(self.max_tiles * h / w))), self.max_tiles)
+            nx = max(1, self.max_tiles // ny)
+            ys = np.unique(np.linspace(0, h - t, ny).astype(int) // 8 * 8)
+            xs = np.unique(np.linspace(0, w - t, nx).astype(int) // 8 * 8)
+            return NativeTiles([ImageAnalysisContext(self.array[y:y+t, x:x+t]) for y in ys for x in xs])
+        return self._memo('native', compute)
+    
+    @property
+    def array(self):
+        return self._memo('array', lambda: np.array(self.image))
+    
+    @property
+    def content_hash(self):
+        """Digest of the decoded pixels (and their shape and dtype)"""
+        def compute():
+            arr = np.ascontiguousarray(self.array)
+            digest = hashlib.sha256(f"{arr.shape}{arr.dtype}".encode())
+            digest.update(memoryview(arr).cast('B'))
+            return digest.hexdigest()
+        return self._memo('content_hash', compute)
+    
+    @property
+    def gray(self):
+        def compute():
+            if len(self.array.shape) == 3:
+                return cv2.cvtColor(self.array, cv2.COLOR_RGB2GRAY)
+            return self.array
+        return self._memo('gray', compute)
+    
+    @property
+    def gray_f32(self):
+        return self._memo('gray_f32', lambda: self.gray.astype(np.float32))
+    
+    @property
+    def hsv(self):
+        return self._memo('hsv', lambda: cv2.cvtColor(self.array, cv2.COLOR_RGB2HSV))
+    
+    @property
+    def color_stats(self):
+        """
+        Linear-time color statistics for an RGB array, without per-channel copies:
+        channel histograms, saturation spread, unique color count and the share
+        of zero differences between consecutive samples of each flattened channel.
+        """
+        def compute():
+            arr = self.array
+            h, w = arr.shape[:2]
+            histograms = [cv2.calcHist([arr], [c], None, [256], [0, 256]) for c in range(3)]
+            
+            # Saturation std from its histogram instead of over a float copy
+            sat_hist = cv2.calcHist([self.hsv], [1], None, [256], [0, 256]).ravel().astype(np.float64)
+            levels = np.arange(256)
+            sat_mean = (sat_hist @ levels) / sat_hist.sum()
+            sat_std = np.sqrt((sat_hist @ (levels - sat_mean)**2) / sat_hist.sum())
+            
+            # Unique colors: mark packed 24-bit RGB values in a 16 MB presence table
+            packed = arr[:, :, 0].astype(np.uint32)
+            packed <<= 8
+            packed |= arr[:, :, 1]
+            packed <<= 8
+            packed |= arr[:, :, 2]
+            seen = np.zeros(1 << 24, dtype=bool)
+            seen[packed] = True
+            unique_colors = np.count_nonzero(seen)
+            
+            # np.diff(channel.flatten()) == 0 is equal horizontal neighbours plus
+            # each row's last sample against the next row's first
+            zero_diffs = np.count_nonzero(arr[:, 1:, :3] == arr[:, :-1, :3], axis=(0, 1))
+            zero_diffs += np.count_nonzero(arr[1:, 0, :3] == arr[:-1, -1, :3], axis=0)
+            total_diffs = h * w - 1
+            banding_ratios = zero_diffs / total_diffs if total_diffs > 0 else None
+            
+            return {
+                'histograms': histograms,
+                'sat_std': sat_std,
+                'unique_colors': unique_colors,
+                'total_pixels': h * w,
+                'banding_ratios': banding_ratios,
+            }
+        return self._memo('color_stats', compute)
+    
+    @property
+    def laplacian(self):
+        return self._memo('laplacian', lambda: cv2.Laplacian(self.gray, cv2.CV_64F))
+    
+    @property
+    def local_variance(self):
+        """5x5 local variance of the grayscale image"""
+        def compute():
+            kernel = np.ones((5,5), np.float32) / 25
+            local_mean = cv2.filter2D(self.gray_f32, -1, kernel)
+            return cv2.filter2D((self.gray_f32 - local_mean)**2, -1, kernel)
+        return self._memo('local_variance', compute)
+    
+    @property
+    def gradient_magnitude(self):
+        def compute():
+            sobel_x = cv2.Sobel(self.gray, cv2.CV_64F, 1, 0, ksize=3)
+            sobel_y = cv2.Sobel(self.gray, cv2.CV_64F, 0, 1, ksize=3)
+            return np.sqrt(sobel_x**2 + sobel_y**2)
+        return self._memo('gradient_magnitude', compute)
+    
+    @property
+    def checkerboard_response(self):
+        """Response to a 2x2 checkerboard kernel (GAN transposed-conv artifacts)"""
+        kernel_checkerboard = np.array([[1, -1], [-1, 1]])
+        return self._memo('checkerboard_response', lambda: cv2.filter2D(self.gray_f32, -1, kernel_checkerboard))
+    
+    @property
+    def blur_residual(self):
+        """Grayscale minus its 5x5 Gaussian blur"""
+        return self._memo('blur_residual', lambda: self.gray_f32 - cv2.GaussianBlur(self.gray_f32, (5, 5), 1.0))
+    
+    @property
+    def resample_diff(self):
+        """Absolute difference to the image downsampled 2x and upsampled back"""
+        def compute():
+            h, w = self.gray.shape
+            downsampled = cv2.resize(self.gray, (w//2, h//2), interpolation=cv2.INTER_AREA)
+            upsampled = cv2.resize(downsampled, (w, h), interpolation=cv2.INTER_CUBIC)
+            return np.abs(self.gray_f32 - upsampled.astype(np.float32))
+        return self._memo('resample_diff', compute)
+    
+    @property
+    def noise_residual(self):
+        """High-pass residual used by the noise and real-photo analyzers"""
+        kernel = np.array([[-1,-1,-1], [-1,8,-1], [-1,-1,-1]])
+        return self._memo('noise_residual', lambda: cv2.filter2D(self.gray_f32, -1, kernel))
+    
+    @property
+    def contour_features(self):
+        """
+        Canny edges -> external contours, with point count, perimeter, area and
+        circularity of every contour computed as arrays in one pass
+        """
+        def compute():
+            edges = cv2.Canny(self.gray, 50, 150)
+            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if len(contours) == 0:
+                empty = np.zeros(0)
+                return {'count': 0, 'points': empty, 'perimeter': empty, 'area': empty, 'circularity': empty}
+            
+            points = np.array([len(c) for c in contours])
+            starts = np.concatenate([[0], np.cumsum(points)[:-1]])
+            xy = np.concatenate(contours).reshape(-1, 2).astype(np.float64)
+            # Index of the next vertex, wrapping each contour back to its start (closed curves)
+            nxt = np.arange(len(xy)) + 1
+            nxt[starts + points - 1] = starts
+            
+            seg = xy[nxt] - xy
+            perimeter = np.add.reduceat(np.hypot(seg[:, 0], seg[:, 1]), starts)
+            cross = xy[:, 0] * xy[nxt, 1] - xy[nxt, 0] * xy[:, 1]
+            area = np.abs(np.add.reduceat(cross, starts)) / 2
+            with np.errstate(divide='ignore', invalid='ignore'):
+                circularity = np.where(area > 0, 4 * np.pi * area / (perimeter * perimeter), np.nan)
+            return {'count': len(contours), 'points': points, 'perimeter': perimeter,
+                    'area': area, 'circularity': circularity}
+        return self._memo('contour_features', compute)
+    
+    def gray_pyramid_level(self, max_side):
+        """Grayscale image pyrDown-ed until its largest side is at most max_side"""
+        def compute():
+            level = self.gray
+            while max_side and max(level.shape) > max_side:
+                level = cv2.pyrDown(level)
+            return level
+        return self._memo(('gray_pyramid', max_side), compute)
+    
+    @property
+    def fft_magnitude(self):
+        """Centered magnitude spectrum of the grayscale image"""
+        return self._memo('fft_magnitude', lambda: np.abs(fftshift(fft2(self.gray))))
+    
+    @property
+    def fft_distances(self):
+        """Distance of every spectrum bin from the center"""
+        def compute():
+            h, w = self.gray.shape
+            y, x = np.ogrid[:h, :w]
+            return np.sqrt((x - w // 2)**2 + (y - h // 2)**2)
+        return self._memo('fft_distances', compute)
+    
+    @property
+    def lbp(self):
+        radius = 3
+        n_points = 8 * radius
+        return self._memo('lbp', lambda: feature.local_binary_pattern(self.gray, n_points, radius, method='uniform'))
+    
+    @property
+    def blocks(self):
+        """Every 8x8 grayscale block scanned by the block analyzers, as (nblocks, 8, 8)"""
+        def compute():
+            h, w = self.gray.shape
+            nby, nbx = len(range(0, h-8, 8)), len(range(0, w-8, 8))
+            tiles = self.gray[:nby*8, :nbx*8].reshape(nby, 8, nbx, 8)
+            return tiles.transpose(0, 2, 1, 3).reshape(-1, 8, 8)
+        return self._memo('blocks', compute)
+    
+    @property
+    def block_grid_count(self):
+        """Number of 8x8 cells in the image, the denominator of block ratios"""
+        h, w = self.gray.shape
+        return (h//8) * (w//8)
+    
+    @property
+    def block_dct(self):
+        """Orthonormal 8x8 DCT-II of all blocks at once (same as cv2.dct per block)"""
+        return self._memo('block_dct', lambda: DCT_8 @ self.blocks.astype(np.float64) @ DCT_8.T)
+    
+    @property
+    def block_hf_ratio(self):
+        """High-frequency share of each block's DCT energy (NaN for empty blocks)"""
+        def compute():
+            abs_dct = np.abs(self.block_dct)
+            high_freq_energy = abs_dct[:, 4:, 4:].sum(axis=(1, 2))
+            total_energy = abs_dct.sum(axis=(1, 2))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(total_energy > 0, high_freq_energy / total_energy, np.nan)
+        return self._memo('block_hf_ratio', compute)
+
+class NativeTiles(_Memoized):
+    """
+    Native-resolution tiles standing in for a large image in the
+    resolution-sensitive analyzers. Reading an ImageAnalysisContext
+    intermediate joins it across tiles: pixel maps are flattened and
+    concatenated, per-block arrays concatenated and counts summed, so the
+    flat statistics the analyzers take over them carry over unchanged.
+    """
+    
+    def __init__(self, tiles):
+        super().__init__()
+        self.tiles = tiles
+        
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        def compute():
+            values = [getattr(tile, name) for tile in self.tiles]
+            if np.isscalar(values[0]):
+                return sum(values)
+            if values[0].ndim == 2:
+                return np.concatenate([value.ravel() for value in values])
+            return np.concatenate(values)
+        return self._memo(name, compute)
+
+@dataclass(frozen=True)
+class JudgeResult:
+    """Immutable outcome of one judge call; safe to share between threads"""
+    verdict: str
+    confidence: str
+    score_low: float
+    score_high: float
+    criteria: MappingProxyType
+    real_photo_score: float
+    report: str
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'criteria', MappingProxyType(dict(self.criteria)))
+        
+    def __reduce__(self):
+        return (JudgeResult, (self.verdict, self.confidence, self.score_low, self.score_high,
+                              dict(self.criteria), self.real_photo_score, self.report))
+    
+    @property
+    def total_score(self):
+        """Exact total for full reports, lower bound when scoring stopped early"""
+        return self.score_low
+
+class AIImageJudge:
+    # Criterion -> analyzer method
+    ANALYZERS = {
+        'pixel_consistency': 'analyze_pixel_consistency',
+        'compression_artifacts': 'analyze_compression_artifacts',
+        'noise_patterns': 'analyze_noise_patterns',
+        'edge_coherence': 'analyze_edge_coherence',
+        'color_distribution': 'analyze_color_distribution',
+        'texture_analysis': 'analyze_texture_patterns',
+        'symmetry_analysis': 'analyze_symmetry',
+        'frequency_domain': 'analyze_frequency_domain',
+        'statistical_anomalies': 'analyze_statistical_anomalies',
+        'gan_artifacts': 'analyze_gan_artifacts',
+        'diffusion_patterns': 'analyze_diffusion_patterns',
+        'upsampling_detection': 'analyze_upsampling_detection'
+    }
+    
+    # EXTREME weighting - heavily favor AI detection
+    WEIGHTS = {
+        'pixel_consistency': 0.20,
+        'noise_patterns': 0.18,
+        'compression_artifacts': 0.15,
+        'statistical_anomalies': 0.12,
+        'gan_artifacts': 0.10,
+        'diffusion_patterns': 0.10,
+        'upsampling_detection': 0.08,
+        'edge_coherence': 0.04,
+        'color_distribution': 0.02,
+        'texture_analysis': 0.01,
+        'symmetry_analysis': 0.00,
+        'frequency_domain': 0.00
+    }
+    
+    # Relative analyzer cost (seconds on a 1024x1024 image, shared context)
+    COSTS = {
+        'pixel_consistency': 0.05,
+        'compression_artifacts': 0.015,
+        'noise_patterns': 0.04,
+        'edge_coherence': 0.08,
+        'color_distribution': 0.05,
+        'texture_analysis': 0.6,
+        'symmetry_analysis': 0.02,
+        'frequency_domain': 0.01,
+        'statistical_anomalies': 1.25,
+        'gan_artifacts': 0.7,
+        'diffusion_patterns': 0.06,
+        'upsampling_detection': 0.03,
+        'real_photo_indicators': 0.01
+    }
+    
+    def __init__(self, upsampling_max_side=1024, analyzer_workers=ANALYZER_WORKERS,
+                 resolution_policy=RESOLUTION_POLICY, cache=judge_cache):
+        # Configuration only: all per-image state lives in the context and the
+        # returned JudgeResult, so one judge can serve concurrent requests
+        # Largest side the upsampling repetition check runs at (None = native)
+        self.upsampling_max_side = upsampling_max_side
+        # Policy name from RESOLUTION_POLICIES, or a dict of the same shape
+        if isinstance(resolution_policy, str):
+            resolution_policy = RESOLUTION_POLICIES[resolution_policy]
+        self.resolution_policy = dict(resolution_policy)
+        # JudgeCache of criteria vectors (None disables caching). Keys combine
+        # the pixel hash with everything that changes the scores.
+        self.cache = cache
+        self.cache_namespace = json.dumps([ANALYZER_VERSION, upsampling_max_side, self.resolution_policy], sort_keys=True)
+        # Pool used by judge(parallel=True); threads are started on first use
+        self.executor = ThreadPoolExecutor(max_workers=analyzer_workers, thread_name_prefix="judge")
+        # Process pool reused by judge_batch calls without explicit workers
+        self._batch_pool = None
+        self._batch_pool_lock = threading.Lock()
+        
+    def _context(self, image):
+        if isinstance(image, ImageAnalysisContext):
+            return image
+        return ImageAnalysisContext(image, **self.resolution_policy)
         
     def analyze_pixel_consistency(self, image):
         """Analyze pixel-level consistency patterns typical in AI images"""
-        img_array = np.array(image)
-        
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        px = self._context(image).native
             
-        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+        laplacian_var = px.laplacian.var()
         
        
-        kernel = np.ones((5,5), np.float32) / 25
-        local_mean = cv2.filter2D(gray.astype(np.float32), -1, kernel)
-        local_variance = cv2.filter2D((gray.astype(np.float32) - local_mean)**2, -1, kernel)
-        
-        variance_uniformity = np.std(local_variance)
+        variance_uniformity = np.std(px.local_variance)
         
         
         score = 0
@@ -65,9 +522,7 @@ class AIImageJudge:
             score += 70
             
    
-        sobel_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobel_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        gradient_magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
+        gradient_magnitude = px.gradient_magnitude
         gradient_std = np.std(gradient_magnitude)
         gradient_mean = np.mean(gradient_magnitude)
         
@@ -79,7 +534,7 @@ class AIImageJudge:
             score += 25
             
       
-        pixel_std = np.std(gray)
+        pixel_std = np.std(px.gray)
         if pixel_std > 90:  
             score += 20
         if pixel_std > 120:  
@@ -89,35 +544,14 @@ class AIImageJudge:
     
     def analyze_compression_artifacts(self, image):
         """Detect JPEG compression artifacts - real photos usually have more"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        px = self._context(image).native
             
         
-        h, w = gray.shape
-        block_artifacts = 0
-        very_clean_blocks = 0
+        ratio = px.block_hf_ratio
+        block_artifacts = np.count_nonzero(ratio < 0.15)
+        very_clean_blocks = np.count_nonzero(ratio < 0.05)
         
-        for i in range(0, h-8, 8):
-            for j in range(0, w-8, 8):
-                block = gray[i:i+8, j:j+8].astype(np.float32)
-                dct_block = cv2.dct(block)
-                
-               
-                high_freq_energy = np.sum(np.abs(dct_block[4:, 4:]))
-                total_energy = np.sum(np.abs(dct_block))
-                
-                if total_energy > 0:
-                    ratio = high_freq_energy / total_energy
-                    if ratio < 0.15: 
-                        block_artifacts += 1
-                    if ratio < 0.05:  
-                        very_clean_blocks += 1
-        
-        total_blocks = ((h//8) * (w//8))
+        total_blocks = px.block_grid_count
         if total_blocks > 0:
             artifact_ratio = block_artifacts / total_blocks
             clean_ratio = very_clean_blocks / total_blocks
@@ -128,16 +562,10 @@ class AIImageJudge:
     
     def analyze_noise_patterns(self, image):
         """Analyze noise patterns - AI images often lack natural sensor noise"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        ctx = self._context(image)
             
        
-        kernel = np.array([[-1,-1,-1], [-1,8,-1], [-1,-1,-1]])
-        noise = cv2.filter2D(gray.astype(np.float32), -1, kernel)
+        noise = ctx.native.noise_residual
         
        
         noise_std = np.std(noise)
@@ -179,57 +607,34 @@ class AIImageJudge:
     
     def analyze_edge_coherence(self, image):
         """Analyze edge patterns - AI images sometimes have inconsistent edges"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        ctx = self._context(image)
             
-        # Detect edges using Canny
-        edges = cv2.Canny(gray, 50, 150)
-        
-        # Analyze edge connectivity and coherence
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Edge contours and their circularity (shared with the real-photo check)
+        contours = ctx.proxy.contour_features
         
-        if len(contours) == 0:
+        if contours['count'] == 0:
             return 60  # Suspicious lack of edges
             
-        # Check for unnaturally smooth contours
-        smooth_contours = 0
-        for contour in contours:
-            if len(contour) > 10:
-                # Calculate contour smoothness
-                perimeter = cv2.arcLength(contour, True)
-                area = cv2.contourArea(contour)
-                if area > 0:
-                    circularity = 4 * np.pi * area / (perimeter * perimeter)
-                    if circularity > 0.8:  # Too circular/smooth
-                        smooth_contours += 1
-        
-        if len(contours) > 0:
-            smooth_ratio = smooth_contours / len(contours)
-            return min(smooth_ratio * 80, 100)
-        
-        return 0
+        # Check for unnaturally smooth (too circular) contours
+        smooth_contours = np.count_nonzero((contours['points'] > 10) & (contours['circularity'] > 0.8))
+        smooth_ratio = smooth_contours / contours['count']
+        return min(smooth_ratio * 80, 100)
     
     def analyze_color_distribution(self, image):
         """Analyze color distribution patterns"""
-        img_array = np.array(image)
+        ctx = self._context(image).proxy
+        img_array = ctx.array
         
         if len(img_array.shape) != 3:
             return 0
             
-        # Analyze color histogram
-        hist_r = cv2.calcHist([img_array], [0], None, [256], [0, 256])
-        hist_g = cv2.calcHist([img_array], [1], None, [256], [0, 256])
-        hist_b = cv2.calcHist([img_array], [2], None, [256], [0, 256])
+        color_stats = ctx.color_stats
         
         # Check for unnatural color distributions
         score = 0
         
         # AI images often have too-perfect color gradients
-        for hist in [hist_r, hist_g, hist_b]:
+        for hist in color_stats['histograms']:
             hist_smooth = np.convolve(hist.flatten(), np.ones(7)/7, mode='same')
             smoothness = np.std(hist - hist_smooth.reshape(-1, 1))
             if smoothness < 20:  # Increased threshold
@@ -238,9 +643,7 @@ class AIImageJudge:
                 score += 30
         
         # Check for AI's characteristic color saturation patterns
-        hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
-        saturation = hsv[:, :, 1]
-        sat_std = np.std(saturation)
+        sat_std = color_stats['sat_std']
         
         if sat_std > 45:  # AI often has high saturation variance
             score += 20
@@ -248,10 +651,7 @@ class AIImageJudge:
             score += 25
             
         # Check for unnatural color clustering
-        colors_reshaped = img_array.reshape(-1, 3)
-        unique_colors = len(np.unique(colors_reshaped.view(np.dtype((np.void, colors_reshaped.dtype.itemsize*3)))))
-        total_pixels = colors_reshaped.shape[0]
-        color_diversity = unique_colors / total_pixels
+        color_diversity = color_stats['unique_colors'] / color_stats['total_pixels']
         
         if color_diversity > 0.8:  # Higher threshold - real photos can have many colors
             score += 30
@@ -259,12 +659,8 @@ class AIImageJudge:
             score += 50
             
         # Check for AI's characteristic color banding
-        for channel in [img_array[:,:,0], img_array[:,:,1], img_array[:,:,2]]:
-            channel_diff = np.diff(channel.flatten())
-            zero_diffs = np.sum(channel_diff == 0)
-            total_diffs = len(channel_diff)
-            if total_diffs > 0:
-                banding_ratio = zero_diffs / total_diffs
+        if color_stats['banding_ratios'] is not None:
+            for banding_ratio in color_stats['banding_ratios']:
                 if banding_ratio > 0.3:  # Too much banding = AI
                     score += 20
                 if banding_ratio > 0.5:  # Extreme banding = AI
@@ -274,17 +670,12 @@ class AIImageJudge:
     
     def analyze_texture_patterns(self, image):
         """Analyze texture patterns using Local Binary Patterns"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        ctx = self._context(image)
             
         # Calculate Local Binary Pattern
         radius = 3
         n_points = 8 * radius
-        lbp = feature.local_binary_pattern(gray, n_points, radius, method='uniform')
+        lbp = ctx.proxy.lbp
         
         # Analyze LBP histogram
         lbp_hist, _ = np.histogram(lbp.ravel(), bins=n_points + 2, range=(0, n_points + 2))
@@ -304,12 +695,7 @@ class AIImageJudge:
     
     def analyze_symmetry(self, image):
         """Analyze unnatural symmetry patterns"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        gray = self._context(image).proxy.gray
             
         h, w = gray.shape
         
@@ -352,25 +738,16 @@ class AIImageJudge:
     
     def analyze_frequency_domain(self, image):
         """Analyze frequency domain characteristics"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        ctx = self._context(image).proxy
             
         # Apply FFT
-        f_transform = np.fft.fft2(gray)
-        f_shift = np.fft.fftshift(f_transform)
-        magnitude_spectrum = np.log(np.abs(f_shift) + 1)
+        magnitude_spectrum = np.log(ctx.fft_magnitude + 1)
         
         # Analyze frequency distribution
         h, w = magnitude_spectrum.shape
-        center_y, center_x = h // 2, w // 2
         
         # Create rings to analyze frequency content
-        y, x = np.ogrid[:h, :w]
-        distances = np.sqrt((x - center_x)**2 + (y - center_y)**2)
+        distances = ctx.fft_distances
         
         # Analyze high vs low frequency content
         low_freq_mask = distances < min(h, w) * 0.1
@@ -390,18 +767,12 @@ class AIImageJudge:
     
     def analyze_real_photo_indicators(self, image):
         """Look for indicators that suggest a real photograph"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        ctx = self._context(image)
             
         real_score = 0
         
         # Check for natural sensor noise patterns
-        kernel = np.array([[-1,-1,-1], [-1,8,-1], [-1,-1,-1]])
-        noise = cv2.filter2D(gray.astype(np.float32), -1, kernel)
+        noise = ctx.native.noise_residual
         noise_randomness = np.std(noise) / (np.mean(np.abs(noise)) + 1e-10)
         
         if noise_randomness > 2:  # Natural randomness = real photo
@@ -410,12 +781,7 @@ class AIImageJudge:
             real_score += 20
             
         # Check for natural JPEG compression artifacts
-        h, w = gray.shape
-        block_variance = []
-        for i in range(0, h-8, 8):
-            for j in range(0, w-8, 8):
-                block = gray[i:i+8, j:j+8]
-                block_variance.append(np.var(block))
+        block_variance = ctx.native.blocks.var(axis=(1, 2))
         
         if len(block_variance) > 0:
             variance_std = np.std(block_variance)
@@ -423,36 +789,20 @@ class AIImageJudge:
                 real_score += 25
                 
         # Check for natural edge imperfections
-        edges = cv2.Canny(gray, 50, 150)
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        contours = ctx.proxy.contour_features
         
-        if len(contours) > 0:
+        if contours['count'] > 0:
             # Real photos have more irregular contours
-            irregular_contours = 0
-            for contour in contours:
-                if len(contour) > 10:
-                    perimeter = cv2.arcLength(contour, True)
-                    area = cv2.contourArea(contour)
-                    if area > 0:
-                        circularity = 4 * np.pi * area / (perimeter * perimeter)
-                        if circularity < 0.3:  # Irregular = real
-                            irregular_contours += 1
-            
-            if len(contours) > 0:
-                irregularity_ratio = irregular_contours / len(contours)
-                if irregularity_ratio > 0.6:  # Many irregular contours = real
-                    real_score += 20
+            irregular_contours = np.count_nonzero((contours['points'] > 10) & (contours['circularity'] < 0.3))
+            irregularity_ratio = irregular_contours / contours['count']
+            if irregularity_ratio > 0.6:  # Many irregular contours = real
+                real_score += 20
                     
         return min(real_score, 100)
     
     def analyze_statistical_anomalies(self, image):
         """Detect statistical patterns typical of AI generation"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        gray = self._context(image).proxy.gray
             
         score = 0
         
@@ -487,18 +837,13 @@ class AIImageJudge:
     
     def analyze_gan_artifacts(self, image):
         """Detect GAN-specific artifacts"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        ctx = self._context(image)
+        gray = ctx.proxy.gray
             
         score = 0
         
         # Check for checkerboard artifacts (common in GANs)
-        kernel_checkerboard = np.array([[1, -1], [-1, 1]])
-        checkerboard_response = cv2.filter2D(gray.astype(np.float32), -1, kernel_checkerboard)
+        checkerboard_response = ctx.native.checkerboard_response
         checkerboard_energy = np.mean(np.abs(checkerboard_response))
         
         if checkerboard_energy > 5:  # Checkerboard artifacts = GAN
@@ -510,38 +855,30 @@ class AIImageJudge:
         # Divide image into patches and check for repetitive patterns
         h, w = gray.shape
         patch_size = 32
-        patches = []
-        
-        for i in range(0, h-patch_size, patch_size//2):
-            for j in range(0, w-patch_size, patch_size//2):
-                patch = gray[i:i+patch_size, j:j+patch_size]
-                patches.append(patch.flatten())
+        stride = patch_size // 2
+        rows = len(range(0, h-patch_size, stride))
+        cols = len(range(0, w-patch_size, stride))
+        n_patches = rows * cols
                 
-        if len(patches) > 10:
-            patches = np.array(patches)
-            # Check for too similar patches (mode collapse)
-            correlations = np.corrcoef(patches)
-            high_corr_count = np.sum(correlations > 0.9) - len(patches)  # Exclude diagonal
-            if high_corr_count > len(patches) * 0.3:  # Too many similar patches = GAN
+        if n_patches > 10:
+            windows = np.lib.stride_tricks.sliding_window_view(gray, (patch_size, patch_size))
+            windows = windows[:rows * stride:stride, :cols * stride:stride]
+            # Check for too similar patches (mode collapse), excluding the diagonal
+            high_corr_count = count_correlated_patches(windows, 0.9, limit=n_patches * 0.3)
+            if high_corr_count > n_patches * 0.3:  # Too many similar patches = GAN
                 score += 45
                 
         return min(score, 100)
     
     def analyze_diffusion_patterns(self, image):
         """Detect diffusion model artifacts"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        ctx = self._context(image)
             
         score = 0
         
         # Diffusion models often have characteristic noise residuals
         # Apply Gaussian blur and check residuals
-        blurred = cv2.GaussianBlur(gray.astype(np.float32), (5, 5), 1.0)
-        residual = gray.astype(np.float32) - blurred
+        residual = ctx.native.blur_residual
         
         residual_std = np.std(residual)
         residual_mean = np.mean(np.abs(residual))
@@ -553,17 +890,13 @@ class AIImageJudge:
             score += 45
             
         # Check for diffusion's characteristic frequency patterns
-        f_transform = fft2(gray)
-        f_shift = fftshift(f_transform)
-        magnitude_spectrum = np.abs(f_shift)
+        magnitude_spectrum = ctx.proxy.fft_magnitude
         
         # Diffusion models often have specific frequency signatures
         h, w = magnitude_spectrum.shape
-        center_y, center_x = h // 2, w // 2
         
         # Create frequency rings
-        y, x = np.ogrid[:h, :w]
-        distances = np.sqrt((x - center_x)**2 + (y - center_y)**2)
+        distances = ctx.proxy.fft_distances
         
         # Check mid-frequency energy (diffusion models have characteristic patterns)
         mid_freq_mask = (distances > min(h, w) * 0.1) & (distances < min(h, w) * 0.4)
@@ -579,23 +912,13 @@ class AIImageJudge:
     
     def analyze_upsampling_detection(self, image):
         """Detect AI upsampling artifacts"""
-        img_array = np.array(image)
-        
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
+        ctx = self._context(image)
             
         score = 0
         
         # Check for interpolation artifacts
         # Downsample and upsample, then compare
-        h, w = gray.shape
-        downsampled = cv2.resize(gray, (w//2, h//2), interpolation=cv2.INTER_AREA)
-        upsampled = cv2.resize(downsampled, (w, h), interpolation=cv2.INTER_CUBIC)
-        
-        # Calculate similarity
-        diff = np.abs(gray.astype(np.float32) - upsampled.astype(np.float32))
+        diff = ctx.native.resample_diff
         similarity = 1 - (np.mean(diff) / 255)
         
         if similarity > 0.95:  # Too similar to upsampled version = AI upscaling
@@ -604,8 +927,12 @@ class AIImageJudge:
             score += 40
             
         # Check for regular patterns (AI upsampling artifacts)
-        # Use autocorrelation to detect repetitive patterns
-        autocorr = cv2.matchTemplate(gray, gray[::2, ::2], cv2.TM_CCOEFF_NORMED)
+        # Use autocorrelation to detect repetitive patterns. Its cost grows with
+        # image area times template area, so it runs on a Gaussian-pyramid level
+        # no larger than upsampling_max_side (see benchmarks/bench_upsampling.py
+        # for how closely the decimated result tracks the native one).
+        level = ctx.proxy.gray_pyramid_level(self.upsampling_max_side)
+        autocorr = cv2.matchTemplate(level, level[::2, ::2], cv2.TM_CCOEFF_NORMED)
         max_autocorr = np.max(autocorr)
         
         if max_autocorr > 0.99:  # Perfect repetition = AI
@@ -613,91 +940,283 @@ class AIImageJudge:
             
         return min(score, 100)
     
-    def judge_image(self, image):
-        """Main judging function that analyzes all criteria"""
-        if image is None:
-            return "No image provided", {}
-            
-        # Run all analysis functions
-        self.criteria['pixel_consistency'] = self.analyze_pixel_consistency(image)
-        self.criteria['compression_artifacts'] = self.analyze_compression_artifacts(image)
-        self.criteria['noise_patterns'] = self.analyze_noise_patterns(image)
-        self.criteria['edge_coherence'] = self.analyze_edge_coherence(image)
-        self.criteria['color_distribution'] = self.analyze_color_distribution(image)
-        self.criteria['texture_analysis'] = self.analyze_texture_patterns(image)
-        self.criteria['symmetry_analysis'] = self.analyze_symmetry(image)
-        self.criteria['frequency_domain'] = self.analyze_frequency_domain(image)
-        self.criteria['statistical_anomalies'] = self.analyze_statistical_anomalies(image)
-        self.criteria['gan_artifacts'] = self.analyze_gan_artifacts(image)
-        self.criteria['diffusion_patterns'] = self.analyze_diffusion_patterns(image)
-        self.criteria['upsampling_detection'] = self.analyze_upsampling_detection(image)
-        
-        # Check for real photo indicators to reduce false positives
-        real_photo_score = self.analyze_real_photo_indicators(image)
-        
-        # EXTREME weighting - heavily favor AI detection
-        weights = {
-            'pixel_consistency': 0.20,
-            'noise_patterns': 0.18,
-            'compression_artifacts': 0.15,
-            'statistical_anomalies': 0.12,
-            'gan_artifacts': 0.10,
-            'diffusion_patterns': 0.10,
-            'upsampling_detection': 0.08,
-            'edge_coherence': 0.04,
-            'color_distribution': 0.02,
-            'texture_analysis': 0.01,
-            'symmetry_analysis': 0.00,
-            'frequency_domain': 0.00
-        }
-        
-        total_score = sum(self.criteria[key] * weights[key] for key in weights)
+    def _score_bounds(self, criteria, real_photo_score):
+        """
+        Lowest and highest total score still reachable given the criteria computed
+        so far (a dict subset) and the real-photo score (None if not computed yet).
+        Unknown analyzers can score anywhere in 0-100. With everything known both
+        bounds equal the exact total.
+        """
+        unknown = [key for key in self.WEIGHTS if key not in criteria]
+        total_score = sum(criteria[key] * self.WEIGHTS[key] for key in self.WEIGHTS if key in criteria)
+        low = high = total_score
+        high += sum(self.WEIGHTS[key] * 100 for key in unknown)
         
         # Apply real photo correction
-        if real_photo_score > 40:  # Strong real photo indicators
-            total_score -= 20
+        if real_photo_score is None:
+            low -= 20
+        elif real_photo_score > 40:  # Strong real photo indicators
+            low -= 20
+            high -= 20
         elif real_photo_score > 20:  # Some real photo indicators
-            total_score -= 10
+            low -= 10
+            high -= 10
             
-        # Balanced bonus scoring
-        high_scores = sum(1 for score in self.criteria.values() if score > 40)  # Higher threshold
-        medium_scores = sum(1 for score in self.criteria.values() if score > 25)
-        any_high = sum(1 for score in self.criteria.values() if score > 60)
-        
+        # Bonus counts only grow as more analyzers report
+        high_scores = sum(1 for score in criteria.values() if score > 40)
+        medium_scores = sum(1 for score in criteria.values() if score > 25)
+        any_high = sum(1 for score in criteria.values() if score > 60)
+        low += self._bonus(high_scores, medium_scores, any_high)
+        n = len(unknown)
+        high += self._bonus(high_scores + n, medium_scores + n, any_high + n)
+        return low, high
+    
+    @staticmethod
+    def _bonus(high_scores, medium_scores, any_high):
+        """Balanced bonus scoring"""
+        bonus = 0
         if high_scores >= 3:  # Need more indicators
-            total_score += 15
+            bonus += 15
         if high_scores >= 5:
-            total_score += 25
+            bonus += 25
         if medium_scores >= 7:  # Need more medium scores
-            total_score += 10
+            bonus += 10
         if any_high >= 1:
-            total_score += 20  # Reduced bonus
-            
-        # Balanced thresholds - reduce false positives
+            bonus += 20  # Reduced bonus
+        return bonus
+    
+    @staticmethod
+    def _verdict(total_score):
+        """Balanced thresholds - reduce false positives"""
         if total_score > 45:  # Higher threshold for high confidence
-            verdict = "🤖 AI GENERATED"
-            confidence = "HIGH"
+            return "🤖 AI GENERATED", "HIGH"
         elif total_score > 25:  # Moderate threshold
-            verdict = "🤖 LIKELY AI GENERATED"
-            confidence = "MEDIUM"
+            return "🤖 LIKELY AI GENERATED", "MEDIUM"
         elif total_score > 15:  # Lower threshold for uncertainty
-            verdict = "❓ UNCERTAIN"
-            confidence = "LOW"
+            return "❓ UNCERTAIN", "LOW"
+        return "📷 LIKELY REAL", "MEDIUM"
+    
+    def scoring_plan(self):
+        """
+        Order in which analyzers run: expected score impact (weight, or the
+        real-photo correction) per unit of cost, zero-weight analyzers last.
+        """
+        def impact(key):
+            return 20 if key == 'real_photo_indicators' else self.WEIGHTS[key] * 100
+        keys = list(self.ANALYZERS) + ['real_photo_indicators']
+        return sorted(keys, key=lambda key: (-impact(key) / self.COSTS[key], self.COSTS[key]))
+    
+    def _run_analyzer(self, key, ctx):
+        if key == 'real_photo_indicators':
+            # Check for real photo indicators to reduce false positives
+            return self.analyze_real_photo_indicators(ctx)
+        return getattr(self, self.ANALYZERS[key])(ctx)
+    
+    def _verdict_fixed(self, criteria, real_photo_score):
+        low, high = self._score_bounds(criteria, real_photo_score)
+        return self._verdict(low)[0] == self._verdict(high)[0]
+    
+    def _analyze_serial(self, ctx, full_report):
+        criteria = {}
+        real_photo_score = None
+        for key in self.scoring_plan():
+            score = self._run_analyzer(key, ctx)
+            if key == 'real_photo_indicators':
+                real_photo_score = score
+            else:
+                criteria[key] = score
+            if not full_report and self._verdict_fixed(criteria, real_photo_score):
+                break
+        return criteria, real_photo_score
+    
+    def _analyze_parallel(self, ctx, full_report):
+        """
+        Fan analyzers out over the executor (OpenCV, NumPy and SciPy release
+        the GIL) and gather scores as they finish. Without full_report the
+        analyzers that have not started yet are cancelled once the verdict is
+        fixed.
+        """
+        futures = {self.executor.submit(self._run_analyzer, key, ctx): key for key in self.scoring_plan()}
+        criteria = {}
+        real_photo_score = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                if futures[future] == 'real_photo_indicators':
+                    real_photo_score = future.result()
+                else:
+                    criteria[futures[future]] = future.result()
+            if not full_report and self._verdict_fixed(criteria, real_photo_score):
+                for future in pending:
+                    future.cancel()
+                break
+        return criteria, real_photo_score
+    
+    def _new_batch_pool(self, workers):
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(BATCH_START_METHOD),
+                                   initializer=_init_batch_worker,
+                                   initargs=(self.upsampling_max_side, self.resolution_policy))
+    
+    def batch_pool(self):
+        """The judge's long-lived batch pool (JUDGE_BATCH_WORKERS processes), started on first use"""
+        with self._batch_pool_lock:
+            if self._batch_pool is None:
+                self._batch_pool = self._new_batch_pool(BATCH_WORKERS)
+                # Stop the workers with the judge (or at interpreter exit)
+                weakref.finalize(self, self._batch_pool.shutdown, wait=False, cancel_futures=True)
+            return self._batch_pool
+    
+    def _discard_batch_pool(self, pool):
+        """Drop a broken shared pool so the next batch starts a fresh one"""
+        with self._batch_pool_lock:
+            if self._batch_pool is pool:
+                self._batch_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def judge_batch(self, images, workers=None, full_report=True):
+        """
+        Judge a list of images (PIL images, arrays or file paths) or every
+        image under a directory on a process pool, yielding
+        (key, result, error) as each one finishes. key is the path for files
+        and the list index otherwise; exactly one of result/error is set.
+        
+        Without workers the judge's shared batch_pool() is used, so repeated
+        calls (e.g. from the Gradio interface) don't start processes each
+        time; with workers a dedicated pool is started and shut down after.
+        
+        Results are looked up in and added to the judge's cache here in the
+        parent, so repeated images are never sent to a worker. In-memory
+        images, and files when the cache is on (their pixels are needed for
+        the content hash), are passed as decoded RGB arrays through shared
+        memory rather than pickled; otherwise files are decoded by the
+        workers. At most two images per worker are in flight at a time.
+        """
+        if isinstance(images, (str, os.PathLike)):
+            images = list_images(images)
+        items = iter(enumerate(images))
+        shared = workers is None
+        pool = self.batch_pool() if shared else self._new_batch_pool(workers)
+        window = 2 * (BATCH_WORKERS if shared else workers)
+        pending = {}
+        ready = deque()  # cache hits and decode errors, yielded before waiting again
+        
+        def submit_next():
+            for index, image in items:
+                is_path = isinstance(image, (str, os.PathLike))
+                key = os.fspath(image) if is_path else index
+                if is_path and self.cache is None:
+                    pending[pool.submit(_judge_batch_item, key, full_report)] = (key, None, None)
+                    return
+                try:
+                    arr = _batch_array(Image.open(key) if is_path else image)
+                    ctx = self._context(arr)
+                    cache_key = self._cache_key(ctx)
+                    if cache_key and self.cache.get(cache_key) is not None:
+                        ready.append((key, self.judge(ctx, full_report=full_report), None))
+                        continue
+                except Exception as error:
+                    ready.append((key, None, error))
+                    continue
+                source, shm = _share_array(arr)
+                pending[pool.submit(_judge_batch_item, source, full_report)] = (key, shm, cache_key)
+                return
+            
+        try:
+            for _ in range(window):
+                submit_next()
+            while pending or ready:
+                while ready:
+                    yield ready.popleft()
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, shm, cache_key = pending.pop(future)
+                    if shm is not None:
+                        shm.close()
+                        shm.unlink()
+                    error = future.exception()
+                    if isinstance(error, BrokenProcessPool):
+                        # A worker died: every other result from this pool is lost too
+                        raise error
+                    result = None if error else future.result()
+                    if (cache_key and result is not None and result.real_photo_score is not None
+                            and len(result.criteria) == len(self.ANALYZERS)):
+                        self.cache.put(cache_key, result.criteria, result.real_photo_score)
+                    submit_next()
+                    yield key, result, error
+        except BrokenProcessPool:
+            if shared:
+                self._discard_batch_pool(pool)
+            raise
+        finally:
+            # Closed early (e.g. a cancelled Gradio event): drop what is still in flight
+            for future, (key, shm, cache_key) in pending.items():
+                future.cancel()
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+            if not shared:
+                pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _cache_key(self, ctx):
+        return f"{self.cache_namespace}:{ctx.content_hash}" if self.cache is not None else None
+    
+    def judge_image(self, image, full_report=True, parallel=False):
+        """Main judging function; returns (report, criteria) for the UI"""
+        if image is None:
+            return "No image provided", {}
+        result = self.judge(image, full_report=full_report, parallel=parallel)
+        return result.report, result.criteria
+    
+    def judge(self, image, full_report=True, parallel=False):
+        """
+        Judge one image and return a fresh JudgeResult. With full_report=True
+        every criterion is computed for the report. With full_report=False
+        analyzers run in scoring_plan() order and stop as soon as the verdict
+        can no longer change; the report then lists only the criteria that
+        were needed. parallel=True runs the analyzers on the judge's thread
+        pool instead of one after another.
+        """
+        # Run analysis functions against one shared per-image context
+        ctx = self._context(image)
+        key = self._cache_key(ctx)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            # Cached vectors are always complete, whatever full_report asks for
+            criteria, real_photo_score = cached
+        else:
+            if parallel:
+                criteria, real_photo_score = self._analyze_parallel(ctx, full_report)
+            else:
+                criteria, real_photo_score = self._analyze_serial(ctx, full_report)
+            if key and real_photo_score is not None and len(criteria) == len(self.ANALYZERS):
+                self.cache.put(key, criteria, real_photo_score)
+        
+        # Report criteria in their usual order
+        criteria = {key: criteria[key] for key in self.ANALYZERS if key in criteria}
+        low, high = self._score_bounds(criteria, real_photo_score)
+        total_score = low
+        verdict, confidence = self._verdict(total_score)
+        if low == high:
+            score_text = f"{total_score:.1f}/100"
         else:
-            verdict = "📷 LIKELY REAL"
-            confidence = "MEDIUM"
+            score_text = f"{low:.1f}-{high:.1f}/100 (verdict fixed after {len(criteria)} criteria)"
             
         # Create detailed analysis report
         analysis_details = f"""
 ## 🔍 ANALYSIS REPORT
 **VERDICT: {verdict}**
 **CONFIDENCE: {confidence}**
-**OVERALL SCORE: {total_score:.1f}/100**
+**OVERALL SCORE: {score_text}**
 
 ### 📊 Detailed Criteria Analysis:
 """
         
-        for criterion, score in self.criteria.items():
+        for criterion, score in criteria.items():
             status = "🔴 SUSPICIOUS" if score > 40 else "🟡 MODERATE" if score > 20 else "🟢 NORMAL"
             criterion_name = criterion.replace('_', ' ').title()
             analysis_details += f"- **{criterion_name}**: {score:.1f}/100 {status}\n"
@@ -721,23 +1240,67 @@ class AIImageJudge:
 - Uses 12 AI detection algorithms plus real photo validation patterns
 """
         
-        return analysis_details, self.criteria
+        return JudgeResult(verdict, confidence, low, high, criteria, real_photo_score, analysis_details)
+
+# --- Batch judging ---
+_batch_judge = None
+
+def list_images(directory):
+    """Image files under directory (recursively), in sorted order"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(paths)
+
+def _batch_array(image):
+    """The pixel array a batch worker judges: RGB for PIL images"""
+    return np.asarray(image.convert('RGB') if isinstance(image, Image.Image) else image)
+
+def _share_array(arr):
+    """Copy a pixel array into a new shared-memory block"""
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return (shm.name, arr.shape, arr.dtype.str), shm
+
+def _init_batch_worker(upsampling_max_side, resolution_policy):
+    global _batch_judge
+    # The parent owns cache lookups and writes for batches
+    _batch_judge = AIImageJudge(upsampling_max_side=upsampling_max_side, analyzer_workers=1,
+                                resolution_policy=resolution_policy, cache=None)
+
+def _judge_batch_item(source, full_report):
+    if isinstance(source, str):
+        image = Image.open(source).convert('RGB')
+    else:
+        name, shape, dtype = source
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            image = Image.fromarray(np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy())
+        finally:
+            shm.close()
+    return _batch_judge.judge(image, full_report=full_report)
 
 def create_judge_interface():
     judge = AIImageJudge()
     
     def analyze_images(img1, img2, img3, img4, img5):
         images = [img1, img2, img3, img4, img5]
-        results = []
-        
-        for i, img in enumerate(images, 1):
-            if img is not None:
-                analysis, criteria = judge.judge_image(img)
-                results.append(f"## 🖼️ IMAGE {i}\n{analysis}\n---\n")
-            else:
-                results.append(f"## 🖼️ IMAGE {i}\n*No image provided*\n---\n")
-        
-        return "\n".join(results)
+        results = [f"## 🖼️ IMAGE {i}\n*No image provided*\n---\n" if img is None
+                   else f"## 🖼️ IMAGE {i}\n*Analyzing...*\n---\n" for i, img in enumerate(images, 1)]
+        uploaded = [i for i, img in enumerate(images) if img is not None]
+        if len(uploaded) == 1:
+            analysis, criteria = judge.judge_image(images[uploaded[0]], parallel=True)
+            results[uploaded[0]] = f"## 🖼️ IMAGE {uploaded[0] + 1}\n{analysis}\n---\n"
+        elif uploaded:
+            # Judge the uploads on a process pool and show each report as it finishes
+            batch = judge.judge_batch([images[i] for i in uploaded])
+            for key, result, error in batch:
+                i = uploaded[key]
+                analysis = result.report if error is None else f"*Analysis failed: {error}*"
+                results[i] = f"## 🖼️ IMAGE {i + 1}\n{analysis}\n---\n"
+                yield "\n".join(results)
+        
+        yield "\n".join(results)
     
     # Create Gradio interface
     with gr.Blocks(title="AI Image Judge", theme=gr.themes.Monochrome()) as demo:
@@ -770,7 +1333,8 @@ def create_judge_interface():
         analyze_btn.click(
             analyze_images,
             inputs=[img1, img2, img3, img4, img5],
-            outputs=results
+            outputs=results,
+            concurrency_limit=JUDGE_CONCURRENCY
         )
         
         gr.HTML("""
@@ -781,6 +1345,8 @@ def create_judge_interface():
         </div>
         """)
     
+    # Queue requests so up to JUDGE_CONCURRENCY judgements run side by side
+    demo.queue(default_concurrency_limit=JUDGE_CONCURRENCY)
     return demo
 
 if __name__ == "__main__":
@@ -1,11 +1,9 @@
 import gradio as gr
-import requests
-import io
-from PIL import Image
 import time
 import re
 from dotenv import load_dotenv
 import os
+import inference
 
 # -------------------- Setup --------------------
 load_dotenv()
@@ -49,53 +47,8 @@ def generate_image(prompt: str):
     if not HF_TOKEN:
         return None
 
-    # Try multiple models in order of preference
-    models = [
-        "runwayml/stable-diffusion-v1-5",
-        "CompVis/stable-diffusion-v1-4",
-        "stabilityai/stable-diffusion-2-1-base",
-        "black-forest-labs/FLUX.1-schnell"
-    ]
-
-    for model in models:
-        API_URL = f"https://api-inference.huggingface.co/models/{model}"
-        headers = {"Authorization": f"Bearer {HF_TOKEN}"}
-
-        if "FLUX" in model:
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "guidance_scale": 7.5,
-                    "num_inference_steps": 4,
-                    "width": 1024,
-                    "height": 1024
-                }
-            }
-        else:
-            payload = {"inputs": prompt}
-
-        try:
-            r = requests.post(API_URL, headers=headers, json=payload, timeout=120)
-            if r.status_code == 200:
-                try:
-                    return Image.open(io.BytesIO(r.content))
-                except Exception:
-                    continue
-            elif r.status_code == 503:
-                # Model is loading, try next one
-                continue
-            else:
-                # Check if it's a permissions error
-                try:
-                    error_data = r.json()
-                    if "permissions" in error_data.get("error", "").lower():
-                        continue
-                except:
-                    continue
-        except Exception:
-            continue
-
-    return None
+    # Hedged fan-out over the models, fastest healthy one first
+    return inference.generate_image(prompt, HF_TOKEN, timeout=120)
 
 def chatbot_with_images(message, history):
     if is_image_request(message):
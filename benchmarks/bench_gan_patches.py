@@ -0,0 +1,78 @@
+"""
+Regression benchmark for the mode-collapse check in analyze_gan_artifacts.
+
+Compares the old all-pairs np.corrcoef count with count_correlated_patches
+across image sizes: wall time, peak NumPy memory and whether the +45 score
+decision agrees. The old path is skipped once its P x P matrix would not
+fit comfortably in memory.
+
+Run from the repo root:
+    python benchmarks/bench_gan_patches.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_judge import count_correlated_patches
+
+SIZES = [256, 512, 1024, 2048, 4096]
+MAX_CORRCOEF_BYTES = 2 * 2**30
+PATCH, STRIDE = 32, 16
+
+
+def test_images(size, rng):
+    """A noisy photo-like image and a smooth, highly repetitive one."""
+    noisy = rng.normal(0, 1, (size, size)).cumsum(axis=1)
+    noisy = (noisy - noisy.min()) / (np.ptp(noisy) + 1e-9) * 255
+    yy, xx = np.mgrid[:size, :size]
+    smooth = 128 + 100 * np.sin(xx / 40.0) * np.cos(yy / 55.0)
+    return {"noisy": noisy.astype(np.uint8), "smooth": smooth.astype(np.uint8)}
+
+
+def grid(gray):
+    h, w = gray.shape
+    rows = len(range(0, h - PATCH, STRIDE))
+    cols = len(range(0, w - PATCH, STRIDE))
+    windows = np.lib.stride_tricks.sliding_window_view(gray, (PATCH, PATCH))
+    return windows[:rows * STRIDE:STRIDE, :cols * STRIDE:STRIDE]
+
+
+def old_count(gray):
+    windows = grid(gray)
+    patches = windows.reshape(-1, PATCH * PATCH)
+    return np.sum(np.corrcoef(patches) > 0.9) - len(patches)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'size':>5} {'image':>7} {'patches':>8} {'old s':>7} {'old MB':>8} {'new s':>7} {'new MB':>7} {'old/new count':>22} {'same verdict':>12}")
+    for size in SIZES:
+        for name, gray in test_images(size, rng).items():
+            windows = grid(gray)
+            n = windows.shape[0] * windows.shape[1]
+            limit = n * 0.3
+            new, t_new, m_new = measure(count_correlated_patches, windows, 0.9, None)
+            if n * n * 8 <= MAX_CORRCOEF_BYTES:
+                old, t_old, m_old = measure(old_count, gray)
+                cols = (f"{t_old:>7.2f} {m_old / 2**20:>8.0f}", f"{old:>10.0f}/{new:<11.0f}", str((old > limit) == (new > limit)))
+            else:
+                cols = (f"{'-':>7} {n * n * 8 / 2**30:>6.0f}GB", f"{'-':>10}/{new:<11.0f}", "n/a")
+            print(f"{size:>5} {name:>7} {n:>8} {cols[0]} {t_new:>7.2f} {m_new / 2**20:>7.0f} {cols[1]:>22} {cols[2]:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Single-image latency of AIImageJudge.judge with analyzers run one after
+another versus fanned out over the judge's thread pool.
+
+Each image is judged serially and in parallel (fresh context each run, best
+of --repeat). The report shows both latencies, the speedup, the slowest
+single analyzer (the floor the parallel path can approach) and whether the
+two modes agree on every score.
+
+Run from the repo root:
+    python benchmarks/bench_judge_parallel.py [--workers 16] [--sizes 512 1024 2048]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from ai_judge import AIImageJudge, ImageAnalysisContext
+from common import upscaled_samples
+
+
+def best_of(repeat, fn):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def slowest_analyzer(judge, image):
+    """Time of the slowest analyzer once shared intermediates are warm."""
+    ctx = ImageAnalysisContext(image)
+    for key in judge.scoring_plan():
+        judge._run_analyzer(key, ctx)
+    times = {}
+    for key in judge.scoring_plan():
+        start = time.perf_counter()
+        judge._run_analyzer(key, ctx)
+        times[key] = time.perf_counter() - start
+    key = max(times, key=times.get)
+    return key, times[key]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 1024, 2048])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    judge = AIImageJudge(analyzer_workers=args.workers, cache=None)
+    print(f"{args.workers} analyzer threads, {os.cpu_count()} cores")
+    print(f"{'image':>28} {'serial s':>9} {'parallel s':>10} {'speedup':>8} {'slowest analyzer':>34} {'same':>5}")
+    for name, image in upscaled_samples(args.sizes):
+        t_serial, serial = best_of(args.repeat, lambda: judge.judge(image))
+        t_parallel, parallel = best_of(args.repeat, lambda: judge.judge(image, parallel=True))
+        key, t_key = slowest_analyzer(judge, image)
+        same = serial.criteria == parallel.criteria and serial.real_photo_score == parallel.real_photo_score
+        print(f"{name:>28} {t_serial:>9.3f} {t_parallel:>10.3f} {t_serial / t_parallel:>7.2f}x "
+              f"{key + f' {t_key:.3f}s':>34} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Load benchmark: concurrent encode + verify traffic against the registry.
+
+Each worker process plays one gunicorn worker and issues a mix of encodes
+(stamp a small image + insert) and verifies (decode + lookup). The run uses
+a copy of watermarks.db so the committed database is left untouched. The
+legacy copy stays in rollback-journal mode, and the pooled registry runs
+with its lookup cache disabled, so the comparison measures connection
+handling and WAL rather than cache hits.
+
+Run from the repo root:
+    python benchmarks/bench_registry.py [--workers 4] [--ops 500] [--verify-ratio 0.8]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from registry import CREATE_SQL, LookupCache, WatermarkRegistry
+from watermark_engine import hash_to_bits, bits_to_hash, embed_bits, extract_bits
+
+
+class LegacyRegistry:
+    """The previous connect-per-call implementation, for comparison."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def save_watermark(self, wm_hash, prompt):
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("INSERT OR IGNORE INTO watermarks (hash, prompt) VALUES (?, ?)", (wm_hash, prompt))
+        conn.commit()
+        conn.close()
+
+    def get_prompt_by_hash(self, wm_hash):
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("SELECT prompt FROM watermarks WHERE hash=?", (wm_hash,))
+        row = c.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+
+def run_worker(kind, db_path, worker_id, ops, verify_ratio):
+    reg = LegacyRegistry(db_path) if kind == "legacy" else WatermarkRegistry(db_path, cache=LookupCache(maxsize=0))
+    rng = np.random.default_rng(worker_id)
+    base = rng.integers(0, 256, (256, 256, 4), dtype=np.uint8)
+    stamped = []
+    latencies = []
+    for i in range(ops):
+        start = time.perf_counter()
+        if stamped and rng.random() < verify_ratio:
+            arr = stamped[int(rng.integers(len(stamped)))]
+            reg.get_prompt_by_hash(bits_to_hash(extract_bits(arr, 256), 64))
+        else:
+            prompt = f"{kind}-{worker_id}-{i}-{time.time_ns()}"
+            wm_hash = os.urandom(32).hex()
+            arr = embed_bits(base.copy(), hash_to_bits(wm_hash))
+            reg.save_watermark(wm_hash, prompt)
+            stamped.append(arr)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(kind, db_path, workers, ops, verify_ratio):
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_worker, kind, db_path, w, ops, verify_ratio) for w in range(workers)]
+        latencies = np.concatenate([f.result() for f in futures])
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+    print(f"{kind:>7} {len(latencies) / elapsed:>9.0f} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=500)
+    parser.add_argument("--verify-ratio", type=float, default=0.8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'mode':>7} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for kind in ("legacy", "pooled"):
+            db_path = os.path.join(tmp, f"{kind}.db")
+            shutil.copy(os.path.join(ROOT, "watermarks.db"), db_path)
+            if kind == "legacy":
+                # Plain sqlite3 as the old code used it: no WAL or other pragmas
+                conn = sqlite3.connect(db_path)
+                conn.execute("PRAGMA journal_mode=DELETE")
+                conn.execute(CREATE_SQL)
+                conn.close()
+            else:
+                WatermarkRegistry(db_path).init_db()
+            run(kind, db_path, args.workers, args.ops, args.verify_ratio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Accuracy and latency of the upsampling repetition check at native resolution
+versus on a bounded Gaussian-pyramid level (AIImageJudge.upsampling_max_side).
+
+For each image it reports the max TM_CCOEFF_NORMED autocorrelation from both
+paths, whether the > 0.99 decision agrees and the time each path takes.
+
+Run from the repo root:
+    python benchmarks/bench_upsampling.py [--max-side 1024]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from ai_judge import ImageAnalysisContext
+from common import upscaled_samples
+
+
+def max_autocorr(gray):
+    return float(np.max(cv2.matchTemplate(gray, gray[::2, ::2], cv2.TM_CCOEFF_NORMED)))
+
+
+def test_images():
+    """Sample images upscaled to large sizes plus a few synthetic cases."""
+    yield from upscaled_samples()
+
+    rng = np.random.default_rng(0)
+    for side in (2048, 4096):
+        noise = cv2.GaussianBlur(rng.integers(0, 256, (side, side), dtype=np.uint8), (5, 5), 2)
+        yield f"blurred-noise@{side}", Image.fromarray(noise)
+        tile = rng.integers(0, 256, (64, 64), dtype=np.uint8)
+        yield f"tiled@{side}", Image.fromarray(np.tile(tile, (side // 64, side // 64)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-side", type=int, default=1024)
+    args = parser.parse_args()
+
+    print(f"{'image':>28} {'native':>8} {'pyramid':>8} {'|diff|':>7} {'agree':>6} {'native s':>9} {'pyramid s':>9}")
+    diffs = []
+    for name, image in test_images():
+        ctx = ImageAnalysisContext(image)
+        start = time.perf_counter()
+        native = max_autocorr(ctx.gray)
+        t_native = time.perf_counter() - start
+        start = time.perf_counter()
+        decimated = max_autocorr(ctx.gray_pyramid_level(args.max_side))
+        t_pyramid = time.perf_counter() - start
+        diffs.append(abs(native - decimated))
+        agree = (native > 0.99) == (decimated > 0.99)
+        print(f"{name:>28} {native:>8.4f} {decimated:>8.4f} {diffs[-1]:>7.4f} {str(agree):>6} {t_native:>9.3f} {t_pyramid:>9.3f}")
+    print(f"max |diff| {max(diffs):.4f}, mean |diff| {np.mean(diffs):.4f}")
+
+
+if __name__ == "__main__":
+    main()
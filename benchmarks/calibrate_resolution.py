@@ -0,0 +1,79 @@
+"""
+Calibration report for the judge's analysis resolution policies
+(ai_judge.RESOLUTION_POLICIES).
+
+Every image is judged under each policy and compared with the native run:
+per-image total score, verdict agreement and wall time, followed by the mean
+and max absolute shift of every criterion per policy. Images come from
+sample_images/ upscaled to several sizes, plus any files or directories
+given on the command line (judged at their own size).
+
+Run from the repo root:
+    python benchmarks/calibrate_resolution.py [--sizes 1024 2048 4096] [paths ...]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from ai_judge import AIImageJudge, RESOLUTION_POLICIES, list_images
+from common import upscaled_samples
+
+
+def test_images(sizes, paths):
+    """Upscaled sample images, then every image under the given paths at its own size."""
+    yield from upscaled_samples(sizes)
+    for path in paths:
+        for file in (list_images(path) if os.path.isdir(path) else [path]):
+            try:
+                image = Image.open(file).convert("RGB")
+            except OSError:
+                continue
+            yield f"{os.path.basename(file)}@{max(image.size)}", image
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048, 4096])
+    args = parser.parse_args()
+
+    judges = {name: AIImageJudge(resolution_policy=name, cache=None) for name in RESOLUTION_POLICIES}
+    others = [name for name in judges if name != "native"]
+    shifts = {name: {key: [] for key in AIImageJudge.ANALYZERS} for name in others}
+    agree = {name: [] for name in others}
+
+    header = f"{'image':>32} {'native':>16}" + "".join(f" {name:>22}" for name in others)
+    print(header)
+    for label, image in test_images(args.sizes, args.paths):
+        results, times = {}, {}
+        for name, judge in judges.items():
+            start = time.perf_counter()
+            results[name] = judge.judge(image)
+            times[name] = time.perf_counter() - start
+        native = results["native"]
+        row = f"{label:>32} {native.total_score:>7.1f} {times['native']:>7.2f}s"
+        for name in others:
+            result = results[name]
+            same = result.verdict == native.verdict
+            agree[name].append(same)
+            for key in AIImageJudge.ANALYZERS:
+                shifts[name][key].append(abs(result.criteria[key] - native.criteria[key]))
+            row += f" {result.total_score:>7.1f} {times[name]:>6.2f}s {'same' if same else 'DIFF':>5}"
+        print(row)
+
+    print()
+    print(f"{'criterion':>24}" + "".join(f" {name + ' mean/max |shift|':>28}" for name in others))
+    for key in AIImageJudge.ANALYZERS:
+        print(f"{key:>24}" + "".join(
+            f" {np.mean(shifts[name][key]):>13.1f} / {np.max(shifts[name][key]):<12.1f}" for name in others))
+    print(f"{'verdict agreement':>24}" + "".join(f" {np.mean(agree[name]):>27.0%}" for name in others))
+
+
+if __name__ == "__main__":
+    main()
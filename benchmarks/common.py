@@ -0,0 +1,17 @@
+"""Helpers shared by the judge benchmarks."""
+import glob
+import os
+
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def upscaled_samples(sizes=(1024, 2048, 4096)):
+    """Yield (label, image) for every sample image resized to each longest side."""
+    for path in sorted(glob.glob(os.path.join(ROOT, "sample_images", "*"))):
+        base = Image.open(path).convert("RGB")
+        for side in sizes:
+            scale = side / max(base.size)
+            size = (round(base.width * scale), round(base.height * scale))
+            yield f"{os.path.basename(path)}@{side}", base.resize(size, Image.BICUBIC)
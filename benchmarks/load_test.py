@@ -0,0 +1,179 @@
+"""
+Open-loop load test for the Flask app: drives /chat, /encode and /verify at
+a target request rate and reports throughput, p50/p95/p99 latency and error
+rate per endpoint.
+
+Requests are issued on a fixed schedule whatever the server's response time,
+and latency is measured from each request's scheduled start, so an
+overloaded server shows up as growing latency instead of a quietly lower
+send rate. /chat requests are followed through their background job, which
+is reported separately as "chat job" (enqueue to finished image).
+
+To exercise generation without Hugging Face quota, run the app against the
+mock inference server (any HF_TOKEN value enables generation):
+
+    python benchmarks/mock_inference.py --latency-median 2 --loading-rate 0.05 &
+    INFERENCE_BASE_URL=http://127.0.0.1:8900/models HF_TOKEN=mock SECRET_KEY=dev \\
+        gunicorn watermark_api:app --worker-class gthread --threads 8 -w 4 -b 127.0.0.1:5001 &
+    python benchmarks/load_test.py --url http://127.0.0.1:5001 --rps 20 --duration 60
+
+Run from the repo root:
+    python benchmarks/load_test.py [--url ...] [--rps 10] [--duration 30] [--mix chat=1,encode=2,verify=7]
+"""
+import argparse
+import glob
+import io
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROMPTS = ["a lighthouse at dusk", "a neon coffee shop at night", "a red fox in the snow",
+           "a castle on a cliff", "a futuristic city skyline", "a bowl of ramen, watercolor"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:5001")
+    parser.add_argument("--rps", type=float, default=10.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--mix", default="chat=1,encode=2,verify=7", help="relative endpoint weights")
+    parser.add_argument("--image-size", type=int, default=512, help="side of uploaded images")
+    parser.add_argument("--concurrency", type=int, default=256, help="max requests in flight")
+    parser.add_argument("--job-timeout", type=float, default=180.0)
+    parser.add_argument("--poll", type=float, default=1.0, help="seconds between job polls")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.url = args.url.rstrip("/")
+        self.results = defaultdict(list)  # endpoint -> [(latency, ok)]
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.upload = self.make_upload(args.image_size)
+        # Images /verify can find a watermark in; grows with every successful /encode
+        self.encoded = [open(p, "rb").read() for p in sorted(glob.glob(os.path.join(ROOT, "sample_encoded", "*.png")))]
+        self.counter = 0
+
+    @staticmethod
+    def make_upload(size):
+        paths = sorted(glob.glob(os.path.join(ROOT, "sample_images", "*")))
+        image = Image.open(paths[0]).convert("RGB").resize((size, size)) if paths else \
+            Image.fromarray(np.random.default_rng(0).integers(0, 256, (size, size, 3), dtype=np.uint8))
+        buf = io.BytesIO()
+        image.save(buf, format="PNG")
+        return buf.getvalue()
+
+    def session(self):
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def record(self, endpoint, start, ok):
+        with self.lock:
+            self.results[endpoint].append((time.perf_counter() - start, ok))
+
+    def next_id(self):
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+    def chat(self, start):
+        prompt = f"draw {random.choice(PROMPTS)} #{self.next_id()}"
+        r = self.session().post(f"{self.url}/chat", json={"message": prompt}, timeout=self.args.job_timeout)
+        data = r.json() if r.ok else {}
+        if data.get("type") != "job":
+            # Synchronous server (or an error): the response is the final answer
+            ok = r.ok and data.get("type") == "image"
+            self.record("chat", start, ok)
+            self.record("chat job", start, ok)
+            return
+        self.record("chat", start, r.status_code == 202)
+        deadline = time.perf_counter() + self.args.job_timeout
+        while time.perf_counter() < deadline:
+            time.sleep(self.args.poll)
+            job = self.session().get(f"{self.url}{data['status_url']}", timeout=30).json()
+            if job.get("status") in ("done", "failed"):
+                self.record("chat job", start, job["status"] == "done" and (job.get("result") or {}).get("type") == "image")
+                return
+        self.record("chat job", start, False)
+
+    def encode(self, start):
+        files = {"file": ("upload.png", self.upload, "image/png")}
+        r = self.session().post(f"{self.url}/encode", data={"prompt": f"load test {self.next_id()}"},
+                                files=files, timeout=60)
+        ok = r.status_code == 200 and r.headers.get("Content-Type", "").startswith("image/png")
+        self.record("encode", start, ok)
+        if ok:
+            with self.lock:
+                if len(self.encoded) < 64:
+                    self.encoded.append(r.content)
+
+    def verify(self, start):
+        with self.lock:
+            data = random.choice(self.encoded) if self.encoded else self.upload
+        r = self.session().post(f"{self.url}/verify", files={"file": ("check.png", data, "image/png")}, timeout=60)
+        self.record("verify", start, r.status_code == 200)
+
+    def run_one(self, endpoint, start):
+        try:
+            getattr(self, endpoint)(start)
+        except Exception:
+            self.record(endpoint, start, False)
+            if endpoint == "chat":
+                self.record("chat job", start, False)
+
+    def run(self):
+        weights = dict(item.split("=") for item in self.args.mix.split(","))
+        endpoints = list(weights)
+        probs = np.array([float(weights[e]) for e in endpoints])
+        probs /= probs.sum()
+        rng = np.random.default_rng(self.args.seed)
+        random.seed(self.args.seed)
+
+        total = int(self.args.rps * self.args.duration)
+        began = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            for i in range(total):
+                scheduled = began + i / self.args.rps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.run_one, endpoints[rng.choice(len(endpoints), p=probs)], scheduled)
+            send_time = time.perf_counter() - began
+        return send_time, time.perf_counter() - began
+
+    def report(self, send_time, wall_time):
+        sent = sum(len(v) for k, v in self.results.items() if k != "chat job")
+        print(f"target {self.args.rps:.1f} rps, sent {sent / send_time:.1f} rps over {send_time:.1f}s "
+              f"(all responses in after {wall_time:.1f}s)")
+        print(f"{'endpoint':>10} {'requests':>9} {'ok/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for endpoint in ("chat", "chat job", "encode", "verify"):
+            rows = self.results.get(endpoint)
+            if not rows:
+                continue
+            latencies = np.array([latency for latency, _ in rows]) * 1e3
+            ok = sum(1 for _, good in rows if good)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            print(f"{endpoint:>10} {len(rows):>9} {ok / wall_time:>8.2f} {1 - ok / len(rows):>7.1%} "
+                  f"{p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+
+
+def main():
+    args = parse_args()
+    test = LoadTest(args)
+    test.report(*test.run())
+
+
+if __name__ == "__main__":
+    main()
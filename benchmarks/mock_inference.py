@@ -0,0 +1,133 @@
+"""
+Local stand-in for the Hugging Face inference API, for load tests that must
+not spend real quota. Point the app at it with
+
+    INFERENCE_BASE_URL=http://127.0.0.1:8900/models
+
+It answers POST /models/<org>/<model> like the real API:
+- a PNG of the requested size after a log-normal latency
+  (--latency-median/--latency-sigma, overridable per model with --latency);
+- 503 {"error": "...is currently loading", "estimated_time": ...} for models
+  listed with --loading, and for a random --loading-rate share of all calls;
+- 403 with a permissions error for models listed with --forbidden;
+- 500 for a random --error-rate share of calls;
+- 401 when no bearer token is sent.
+
+Run from the repo root:
+    python benchmarks/mock_inference.py [--port 8900] [--latency-median 2] [--loading-rate 0.05]
+"""
+import argparse
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from PIL import Image
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-median", type=float, default=2.0, help="seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="log-normal shape")
+    parser.add_argument("--latency", action="append", default=[], metavar="MODEL=MEDIAN",
+                        help="per-model median latency override")
+    parser.add_argument("--loading", action="append", default=[], metavar="MODEL",
+                        help="model that always answers 503 loading")
+    parser.add_argument("--forbidden", action="append", default=[], metavar="MODEL",
+                        help="model that answers 403 with a permissions error")
+    parser.add_argument("--loading-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--estimated-time", type=float, default=20.0)
+    parser.add_argument("--size", type=int, default=512, help="side of the returned image")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+class MockInference:
+    def __init__(self, args):
+        self.args = args
+        self.medians = {}
+        for item in args.latency:
+            model, median = item.rsplit("=", 1)
+            self.medians[model] = float(median)
+        self.rng = np.random.default_rng(args.seed)
+        self.lock = threading.Lock()
+        self.counts = {}
+        # One noisy image, encoded once: payload cost is what matters, not content
+        pixels = self.rng.integers(0, 256, (args.size, args.size, 3), dtype=np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(pixels).save(buf, format="PNG")
+        self.png = buf.getvalue()
+
+    def respond(self, model, authorized):
+        """Return (status, content type, body, delay) for one call."""
+        with self.lock:
+            self.counts[model] = self.counts.get(model, 0) + 1
+            roll = self.rng.random()
+            delay = self.rng.lognormal(np.log(self.medians.get(model, self.args.latency_median)),
+                                       self.args.latency_sigma)
+        if not authorized:
+            return 401, "application/json", {"error": "Authorization header is correct, but the token seems invalid"}, 0.0
+        if model in self.args.forbidden:
+            return 403, "application/json", {"error": "This authentication method does not have sufficient permissions"}, 0.05
+        if model in self.args.loading or roll < self.args.loading_rate:
+            return 503, "application/json", {"error": f"Model {model} is currently loading",
+                                              "estimated_time": self.args.estimated_time}, 0.05
+        if roll < self.args.loading_rate + self.args.error_rate:
+            return 500, "application/json", {"error": "Internal server error"}, delay
+        return 200, "image/png", self.png, delay
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not self.path.startswith("/models/"):
+                self.send_error(404)
+                return
+            model = self.path[len("/models/"):]
+            authorized = self.headers.get("Authorization", "").startswith("Bearer ")
+            status, content_type, body, delay = mock.respond(model, authorized)
+            time.sleep(delay)
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            # Call counts per model, for checking what the client actually sent
+            body = json.dumps(mock.counts).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def main():
+    args = parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(MockInference(args)))
+    server.daemon_threads = True
+    print(f"mock inference on http://{args.host}:{server.server_port}/models")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+from registry import LookupCache
+
+# In-memory entries (0 disables the cache) and the optional disk tier
+IMAGE_CACHE_SIZE = int(os.getenv("IMAGE_CACHE_SIZE", 32))
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR") or None
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", 512 * 2**20))
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.lower().split())
+
+
+class ImageCache:
+    """
+    Cache of final watermarked images (PNG data URIs) keyed by normalized
+    prompt and model set. Recent entries live in an in-memory LRU; the
+    optional disk tier keeps one file per entry and evicts the least
+    recently used files once the directory exceeds max_bytes (recency is
+    the file mtime, refreshed on every hit, so it works across processes).
+    """
+
+    def __init__(self, maxsize=IMAGE_CACHE_SIZE, cache_dir=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.enabled = maxsize > 0
+        self.memory = LookupCache(maxsize=max(maxsize, 1))
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+        if self.enabled and cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(prompt: str, models) -> str:
+        return hashlib.sha256(f"{normalize_prompt(prompt)}\0{'|'.join(models)}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.uri")
+
+    def get(self, key):
+        """Return the cached data URI or None."""
+        if not self.enabled:
+            return None
+        found, data_uri = self.memory.get(key)
+        if found:
+            return data_uri
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                data_uri = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        self.disk_hits += 1
+        self.memory.put(key, data_uri)
+        return data_uri
+
+    def put(self, key, data_uri):
+        if not self.enabled:
+            return
+        self.memory.put(key, data_uri)
+        if not self.cache_dir:
+            return
+        # Write then rename, so readers in other processes never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(data_uri)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used files until the tier fits in max_bytes."""
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".uri"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+    def stats(self):
+        return dict(self.memory.stats(), enabled=self.enabled, disk=self.cache_dir, disk_hits=self.disk_hits)
+
+
+image_cache = ImageCache()
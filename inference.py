@@ -0,0 +1,281 @@
+import io
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image
+
+# Text-to-image models in order of preference
+MODELS = [
+    "runwayml/stable-diffusion-v1-5",
+    "CompVis/stable-diffusion-v1-4",
+    "stabilityai/stable-diffusion-2-1-base",
+    "black-forest-labs/FLUX.1-schnell"
+]
+
+# Seconds to wait on a model before hedging with the next one. Once a model
+# has HEDGE_MIN_SAMPLES successful calls its p95 is used instead, but never
+# less than HEDGE_MIN_DELAY, so a few fast calls can't trigger constant hedging.
+HEDGE_DELAY = float(os.getenv("HEDGE_DELAY", 8))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", 2))
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 32))
+LATENCY_WINDOW = 100  # recent calls kept per model
+INFERENCE_BASE_URL = os.getenv("INFERENCE_BASE_URL", "https://api-inference.huggingface.co/models").rstrip("/")
+
+# Circuit breaker: consecutive failures before a model is skipped, and the
+# cooldown, doubling per further failure. 503s and permission errors open the
+# breaker at once (503s for the model's reported estimated_time if given).
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", 2))
+BREAKER_BASE_COOLDOWN = float(os.getenv("BREAKER_BASE_COOLDOWN", 5))
+BREAKER_MAX_COOLDOWN = float(os.getenv("BREAKER_MAX_COOLDOWN", 300))
+
+# Shared by all requests; abandoned hedges finish here without blocking callers
+executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+
+
+def build_payload(model: str, prompt: str) -> dict:
+    if "FLUX" in model:
+        return {
+            "inputs": prompt,
+            "parameters": {
+                "guidance_scale": 7.5,
+                "num_inference_steps": 4,
+                "width": 1024,
+                "height": 1024
+            }
+        }
+    return {"inputs": prompt}
+
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    """Keep-alive session shared by this process' threads (recreated after a fork)."""
+    global _session, _session_pid
+    with _session_lock:
+        if _session_pid != os.getpid():
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=len(MODELS), pool_maxsize=INFERENCE_WORKERS)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session_pid = os.getpid()
+        return _session
+
+
+class ModelHealth:
+    """
+    Per-model circuit breakers. A model whose breaker is open is skipped
+    until its cooldown passes; then a single trial call is let through
+    (half-open) and its outcome closes the breaker or reopens it with a
+    doubled cooldown.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, base_cooldown=BREAKER_BASE_COOLDOWN,
+                 max_cooldown=BREAKER_MAX_COOLDOWN):
+        self.threshold = threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self._state = {}  # model -> [consecutive failures, open until, trial in flight]
+        self._lock = threading.Lock()
+
+    def allow(self, model):
+        """True if a call to model may go out now (claims the half-open trial)."""
+        with self._lock:
+            failures, open_until, trial = self._state.get(model, (0, 0.0, False))
+            if open_until == 0.0:
+                return True
+            if trial or time.monotonic() < open_until:
+                return False
+            self._state[model] = [failures, open_until, True]
+            return True
+
+    def release(self, model):
+        """Give back a half-open trial whose call never went out."""
+        with self._lock:
+            if model in self._state:
+                self._state[model][2] = False
+
+    def success(self, model):
+        with self._lock:
+            self._state.pop(model, None)
+
+    def failure(self, model, cooldown=None):
+        """Record a failure; cooldown forces the breaker open for that long."""
+        with self._lock:
+            failures = self._state.get(model, (0, 0.0, False))[0] + 1
+            if cooldown is None and failures >= self.threshold:
+                cooldown = self.base_cooldown * 2 ** (failures - self.threshold)
+            open_until = 0.0
+            if cooldown is not None:
+                open_until = time.monotonic() + min(cooldown, self.max_cooldown)
+            self._state[model] = [failures, open_until, False]
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {model: {"failures": failures,
+                            "circuit": "closed" if open_until == 0.0 else "half-open" if trial or open_until <= now else "open",
+                            "retry_in": max(open_until - now, 0.0)}
+                    for model, (failures, open_until, trial) in self._state.items()}
+
+
+health = ModelHealth()
+
+
+def call_model(model: str, prompt: str, token: str, timeout=30):
+    """
+    One inference call over the pooled session. Returns a PIL image, or None
+    when the model is loading (503), lacks permissions, errors or returns
+    something that isn't an image; the outcome is fed to the model's breaker.
+    """
+    API_URL = f"{INFERENCE_BASE_URL}/{model}"
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        r = session().post(API_URL, headers=headers, json=build_payload(model, prompt), timeout=timeout)
+    except requests.RequestException:
+        health.failure(model)
+        return None
+    if r.status_code == 200:
+        try:
+            image = Image.open(io.BytesIO(r.content))
+            image.load()
+        except Exception:
+            health.failure(model)
+            return None
+        health.success(model)
+        return image
+
+    try:
+        error = r.json()
+    except ValueError:
+        error = {}
+    error = error if isinstance(error, dict) else {}
+    if r.status_code == 503:
+        # Model is loading: skip it for as long as the API expects loading to take
+        health.failure(model, error.get("estimated_time", health.base_cooldown))
+    elif r.status_code in (401, 403) or "permissions" in str(error.get("error", "")).lower():
+        health.failure(model, health.max_cooldown)
+    else:
+        health.failure(model)
+    return None
+
+
+class LatencyTracker:
+    """
+    Rolling per-model latency and success history, used to order models
+    (healthy and fast first) and to pick when to hedge.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._latencies = {}
+        self._outcomes = {}
+        self._lock = threading.Lock()
+
+    def record(self, model, seconds, ok):
+        with self._lock:
+            self._outcomes.setdefault(model, deque(maxlen=self.window)).append(ok)
+            if ok:
+                self._latencies.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model, q, min_samples=1):
+        """Latency percentile of successful calls, or None with fewer than min_samples."""
+        with self._lock:
+            samples = list(self._latencies.get(model, ()))
+        return float(np.percentile(samples, q)) if samples and len(samples) >= min_samples else None
+
+    def failure_rate(self, model):
+        with self._lock:
+            outcomes = self._outcomes.get(model)
+            return 1 - sum(outcomes) / len(outcomes) if outcomes else 0.0
+
+    def ordered(self, models):
+        """
+        Models sorted by health, then median latency. Models without data keep
+        their preference order behind measured ones, so they are still tried
+        as hedges.
+        """
+        def key(model):
+            p50 = self.percentile(model, 50)
+            return (self.failure_rate(model) >= 0.5, p50 if p50 is not None else float("inf"))
+        return sorted(models, key=key)
+
+    def stats(self):
+        with self._lock:
+            models = list(self._outcomes)
+        result = {}
+        for model in models:
+            p50, p95, p99 = (self.percentile(model, q) for q in (50, 95, 99))
+            with self._lock:
+                calls = len(self._outcomes[model])
+            result[model] = {"calls": calls, "failure_rate": self.failure_rate(model),
+                             "p50": p50, "p95": p95, "p99": p99}
+        return result
+
+
+latency = LatencyTracker()
+
+
+def model_stats():
+    """Latency percentiles merged with circuit-breaker state, per model."""
+    states = health.stats()
+    latencies = latency.stats()
+    result = {}
+    for model in set(latencies) | set(states):
+        result[model] = dict(latencies.get(model, {}),
+                             **states.get(model, {"failures": 0, "circuit": "closed", "retry_in": 0.0}))
+    return result
+
+
+def _timed_call(model, prompt, token, timeout):
+    start = time.perf_counter()
+    image = call_model(model, prompt, token, timeout)
+    latency.record(model, time.perf_counter() - start, image is not None)
+    return image
+
+
+def generate_image(prompt: str, token: str, models=None, timeout=30, hedge_delay=None):
+    """
+    Hedged generation: start the best model, then start the next one whenever
+    the running calls fail or hedge_delay passes without an image (by
+    default the leading model's p95 floored at HEDGE_MIN_DELAY once it has
+    HEDGE_MIN_SAMPLES successes, else HEDGE_DELAY). The first image wins;
+    queued calls are cancelled and in-flight ones are left to finish in the
+    background with their results discarded. Models whose circuit breaker is
+    open are skipped. Returns None if every model fails or is skipped.
+    """
+    remaining = deque(latency.ordered(models or MODELS))
+    if hedge_delay is None:
+        p95 = latency.percentile(remaining[0], 95, min_samples=HEDGE_MIN_SAMPLES)
+        hedge_delay = max(p95, HEDGE_MIN_DELAY) if p95 is not None else HEDGE_DELAY
+    running = {}
+    try:
+        while remaining or running:
+            while remaining:
+                model = remaining.popleft()
+                if health.allow(model):
+                    running[executor.submit(_timed_call, model, prompt, token, timeout)] = model
+                    break
+            if not running:
+                break
+            done, _ = wait(running, timeout=hedge_delay if remaining else None,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                image = future.result()
+                if image is not None:
+                    return image
+    finally:
+        for future, model in running.items():
+            if future.cancel():
+                health.release(model)
+    return None
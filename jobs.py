@@ -0,0 +1,97 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from registry import DB_PATH, ThreadConnections
+
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", 8))
+JOB_TTL = float(os.getenv("JOB_TTL", 3600))  # seconds a finished job stays pollable
+# Seconds a queued or running job may go without an update before it counts
+# as failed (e.g. the process running it died)
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", 600))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+CREATE_SQL = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT,
+        result TEXT,
+        updated REAL
+    )
+"""
+INSERT_SQL = "INSERT INTO jobs (id, status, result, updated) VALUES (?, ?, NULL, ?)"
+UPDATE_SQL = "UPDATE jobs SET status=?, result=?, updated=? WHERE id=? AND status=?"
+START_SQL = "UPDATE jobs SET status=?, updated=? WHERE id=? AND status=?"
+EXPIRE_SQL = "UPDATE jobs SET status=?, result=?, updated=? WHERE id=? AND status IN (?, ?) AND updated < ?"
+SELECT_SQL = "SELECT status, result, updated FROM jobs WHERE id=?"
+PRUNE_SQL = "DELETE FROM jobs WHERE updated < ?"
+
+
+class JobQueue:
+    """
+    Background jobs whose status lives in SQLite, so any web worker process
+    can answer a poll for a job that another process is running. Jobs run on
+    a thread pool in the process that submitted them; a job function returns
+    a JSON-serialisable payload, which becomes the job's result. A job left
+    queued or running for longer than timeout is reported as failed.
+    """
+
+    def __init__(self, db_path=DB_PATH, workers=GENERATION_WORKERS, ttl=JOB_TTL, timeout=JOB_TIMEOUT):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.timeout = timeout
+        # Threads start lazily, so creating the pool before a fork is safe
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._connections = ThreadConnections(db_path, cached_statements=16)
+
+    def connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def init_db(self):
+        self.connection().execute(CREATE_SQL)
+
+    def submit(self, fn, *args) -> str:
+        """Queue fn(*args) and return the new job's id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self.connection()
+        conn.execute(PRUNE_SQL, (now - self.ttl,))
+        conn.execute(INSERT_SQL, (job_id, QUEUED, now))
+        self.executor.submit(self._run, job_id, fn, args)
+        return job_id
+
+    def _run(self, job_id, fn, args):
+        started = self.connection().execute(START_SQL, (RUNNING, time.time(), job_id, QUEUED)).rowcount
+        if not started:
+            return  # expired while queued (or pruned): nobody is waiting for it
+        try:
+            self._update(job_id, DONE, fn(*args))
+        except Exception as e:
+            self._update(job_id, FAILED, {"type": "text", "content": f"❌ Error: {str(e)}"})
+
+    def _update(self, job_id, status, result):
+        """Finish a running job (no-op if it has already been expired)."""
+        payload = json.dumps(result) if result is not None else None
+        self.connection().execute(UPDATE_SQL, (status, payload, time.time(), job_id, RUNNING))
+
+    def get(self, job_id):
+        """Return {"id", "status", "result"} or None for an unknown job."""
+        conn = self.connection()
+        row = conn.execute(SELECT_SQL, (job_id,)).fetchone()
+        if row is None:
+            return None
+        status, result, updated = row
+        now = time.time()
+        if status in (QUEUED, RUNNING) and updated < now - self.timeout:
+            expired = {"type": "text", "content": "❌ Error: Image generation timed out"}
+            if conn.execute(EXPIRE_SQL, (FAILED, json.dumps(expired), now, job_id, QUEUED, RUNNING,
+                                         now - self.timeout)).rowcount:
+                status, result = FAILED, json.dumps(expired)
+        return {"id": job_id, "status": status, "result": json.loads(result) if result else None}
+
+
+jobs = JobQueue()
@@ -0,0 +1,70 @@
+import json
+import os
+import sqlite3
+
+from registry import LookupCache, ThreadConnections
+
+# Optional SQLite file for the disk tier (unset = memory only)
+JUDGE_CACHE_DB = os.getenv("JUDGE_CACHE_DB") or None
+JUDGE_CACHE_SIZE = int(os.getenv("JUDGE_CACHE_SIZE", 1024))
+
+CREATE_SQL = """
+    CREATE TABLE IF NOT EXISTS judge_cache (
+        key TEXT PRIMARY KEY,
+        criteria TEXT,
+        real_photo_score REAL
+    )
+"""
+INSERT_SQL = "INSERT OR REPLACE INTO judge_cache (key, criteria, real_photo_score) VALUES (?, ?, ?)"
+SELECT_SQL = "SELECT criteria, real_photo_score FROM judge_cache WHERE key=?"
+
+
+class JudgeCache:
+    """
+    Content-addressed cache of judge criteria vectors: an in-memory LRU in
+    front of an optional SQLite table, so results survive restarts and are
+    shared between worker processes. Only numbers are stored, as
+    ({criterion: score}, real_photo_score); reports are rebuilt from them.
+    """
+
+    def __init__(self, maxsize=JUDGE_CACHE_SIZE, db_path=JUDGE_CACHE_DB):
+        self.memory = LookupCache(maxsize=maxsize)
+        self.db_path = db_path
+        self.disk_hits = 0
+        self._connections = ThreadConnections(db_path, cached_statements=16, setup=(CREATE_SQL,))
+
+    def connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def get(self, key):
+        """Return (criteria, real_photo_score) or None on a miss."""
+        found, value = self.memory.get(key)
+        if found:
+            return value
+        if self.db_path is None:
+            return None
+        row = self.connection().execute(SELECT_SQL, (key,)).fetchone()
+        if row is None:
+            return None
+        value = (json.loads(row[0]), row[1])
+        self.disk_hits += 1
+        self.memory.put(key, value)
+        return value
+
+    def put(self, key, criteria, real_photo_score):
+        criteria = {name: float(score) for name, score in criteria.items()}
+        real_photo_score = float(real_photo_score)
+        self.memory.put(key, (criteria, real_photo_score))
+        if self.db_path is not None:
+            self.connection().execute(INSERT_SQL, (key, json.dumps(criteria), real_photo_score))
+
+    def clear(self):
+        self.memory.clear()
+        if self.db_path is not None:
+            self.connection().execute("DELETE FROM judge_cache")
+
+    def stats(self):
+        return dict(self.memory.stats(), disk=self.db_path, disk_hits=self.disk_hits)
+
+
+judge_cache = JudgeCache()
@@ -0,0 +1,192 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DB_PATH = "watermarks.db"
+
+# Statements are module constants so sqlite3's per-connection statement cache
+# reuses the prepared statement on every call.
+CREATE_SQL = """
+    CREATE TABLE IF NOT EXISTS watermarks (
+        hash TEXT PRIMARY KEY,
+        prompt TEXT
+    )
+"""
+INSERT_SQL = "INSERT OR IGNORE INTO watermarks (hash, prompt) VALUES (?, ?)"
+SELECT_SQL = "SELECT prompt FROM watermarks WHERE hash=?"
+SELECT_MANY_SQL = "SELECT hash, prompt FROM watermarks WHERE hash IN ({})"
+MAX_IN_PARAMS = 500  # stay well below SQLITE_MAX_VARIABLE_NUMBER
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",  # 8 MB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+class LookupCache:
+    """
+    Bounded LRU cache of hash -> prompt lookups. Misses are cached as well,
+    but only for `negative_ttl` seconds, so a hash registered by another
+    worker process becomes visible after at most that long.
+    """
+
+    def __init__(self, maxsize=4096, negative_ttl=5.0):
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, wm_hash):
+        """Return (found, prompt); prompt is None for a cached miss."""
+        with self._lock:
+            entry = self._entries.get(wm_hash)
+            if entry is not None:
+                prompt, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(wm_hash)
+                    self.hits += 1
+                    return True, prompt
+                del self._entries[wm_hash]
+            self.misses += 1
+            return False, None
+
+    def put(self, wm_hash, prompt):
+        expires = None if prompt is not None else time.monotonic() + self.negative_ttl
+        with self._lock:
+            self._entries[wm_hash] = (prompt, expires)
+            self._entries.move_to_end(wm_hash)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, wm_hash):
+        with self._lock:
+            self._entries.pop(wm_hash, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class ThreadConnections:
+    """
+    One SQLite connection per thread, and per process, so connections never
+    cross a gunicorn fork. Each new connection gets PRAGMAS and then any
+    setup statements.
+    """
+
+    def __init__(self, db_path, cached_statements=64, setup=()):
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        self.setup = setup
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=self.cached_statements)
+            for statement in PRAGMAS + tuple(self.setup):
+                conn.execute(statement)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        """Close the current thread's connection; the next get() opens a new one."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class WatermarkRegistry:
+    """
+    SQLite-backed hash -> prompt registry using ThreadConnections. Lookups
+    go through an in-process LookupCache.
+    """
+
+    def __init__(self, db_path=DB_PATH, cache=None):
+        self.db_path = db_path
+        self.cache = cache if cache is not None else LookupCache()
+        self._connections = ThreadConnections(db_path)
+
+    def connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def init_db(self):
+        self.connection().execute(CREATE_SQL)
+
+    def save_watermark(self, wm_hash, prompt):
+        self.connection().execute(INSERT_SQL, (wm_hash, prompt))
+        self.cache.invalidate(wm_hash)
+
+    def save_watermarks(self, rows):
+        """Insert many (hash, prompt) rows in a single transaction."""
+        rows = list(rows)
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(INSERT_SQL, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        for wm_hash, _ in rows:
+            self.cache.invalidate(wm_hash)
+
+    def get_prompt_by_hash(self, wm_hash):
+        found, prompt = self.cache.get(wm_hash)
+        if found:
+            return prompt
+        row = self.connection().execute(SELECT_SQL, (wm_hash,)).fetchone()
+        prompt = row[0] if row else None
+        self.cache.put(wm_hash, prompt)
+        return prompt
+
+    def get_prompts_by_hashes(self, hashes):
+        """
+        Resolve many hashes at once. Cached entries are answered from memory
+        and the rest with a single SELECT ... WHERE hash IN (...) per chunk.
+        Returns {hash: prompt or None}.
+        """
+        results = {}
+        pending = []
+        for wm_hash in dict.fromkeys(hashes):
+            found, prompt = self.cache.get(wm_hash)
+            if found:
+                results[wm_hash] = prompt
+            else:
+                pending.append(wm_hash)
+        conn = self.connection()
+        for i in range(0, len(pending), MAX_IN_PARAMS):
+            chunk = pending[i:i + MAX_IN_PARAMS]
+            sql = SELECT_MANY_SQL.format(",".join("?" * len(chunk)))
+            rows = dict(conn.execute(sql, chunk).fetchall())
+            for wm_hash in chunk:
+                results[wm_hash] = rows.get(wm_hash)
+                self.cache.put(wm_hash, results[wm_hash])
+        return results
+
+    def close(self):
+        self._connections.close()
+
+
+registry = WatermarkRegistry()
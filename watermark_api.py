@@ -1,25 +1,46 @@
-from flask import Flask, request, render_template, send_file, jsonify
+from flask import Flask, request, render_template, send_file, jsonify, Response
 from PIL import Image
 import numpy as np
 import io
 import hashlib
-import sqlite3
 import os
 from dotenv import load_dotenv
 from PIL import ImageDraw
-import requests
 import time
 import re
 import base64
 import anthropic
 import random
+import zipfile
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from registry import registry
+import inference
+from image_cache import image_cache
+from jobs import jobs, DONE, FAILED
+from watermark_engine import hash_to_bits, bits_to_hash, embed_bits, extract_bits, mark_set_bits, iter_encoded_png, fast_extract_bits
 
 app = Flask(__name__)
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 HF_TOKEN = os.getenv("HF_TOKEN")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-DB_PATH = "watermarks.db"
+STREAM_MIN_PIXELS = int(os.getenv("STREAM_MIN_PIXELS", 4_000_000))
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", os.cpu_count() or 4))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 0.5))  # seconds between SSE status checks
+JOB_EVENTS_MAX_WAIT = float(os.getenv("JOB_EVENTS_MAX_WAIT", 300))  # seconds before an SSE stream gives up
+JOB_EVENTS_HEARTBEAT = 15  # seconds between keep-alive comments on a quiet SSE stream
+# Upload limits: whole request body, and images per batch (zip members are
+# also capped individually and in total once decompressed)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 256 * 2**20))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 1000))
+BATCH_MAX_FILE_BYTES = int(os.getenv("BATCH_MAX_FILE_BYTES", 64 * 2**20))
+BATCH_MAX_TOTAL_BYTES = int(os.getenv("BATCH_MAX_TOTAL_BYTES", 1024 * 2**20))
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES
+
+# Shared pool for batch endpoints; threads start lazily, so this is fork-safe
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
 
 # Initialize Anthropic client
 if ANTHROPIC_API_KEY:
@@ -29,16 +50,8 @@ else:
 
 # --- Database Setup ---
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS watermarks (
-            hash TEXT PRIMARY KEY,
-            prompt TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
+    registry.init_db()
+    jobs.init_db()
 
 init_db()
 
@@ -67,23 +80,7 @@ def encode_watermark(image: Image.Image, wm_hash: str) -> Image.Image:
     Encode watermark bits into the LSBs of the RGB channels, distributed evenly across the image.
     """
     arr = np.array(image.convert("RGBA"), dtype=np.uint8)
-    h, w, _ = arr.shape
-    flat = arr[:, :, :3].flatten()
-
-    # Convert hex hash to binary string
-    bin_str = ''.join(format(int(c, 16), '04b') for c in wm_hash)
-    bin_len = len(bin_str)
-
-    if bin_len > len(flat):
-        raise ValueError("Image too small for watermark!")
-
-    # Spread watermark bits across the flat array
-    step = len(flat) // bin_len
-    for i, bit in enumerate(bin_str):
-        idx = i * step
-        flat[idx] = np.uint8((flat[idx] & 0b11111110) | int(bit))
-
-    arr[:, :, :3] = flat.reshape((h, w, 3))
+    embed_bits(arr, hash_to_bits(wm_hash))
     return Image.fromarray(arr, 'RGBA')
 
 
@@ -99,68 +96,82 @@ def decode_watermark(image: Image.Image, length=64) -> str:
     Decode watermark bits from an image where bits are evenly distributed.
     """
     arr = np.array(image.convert("RGBA"), dtype=np.uint8)
-    flat = arr[:, :, :3].flatten()
+    return bits_to_hash(extract_bits(arr, length * 4), length)
 
-    total_bits = length * 4
-    step = len(flat) // total_bits
-
-    bin_str = ''
-    for i in range(total_bits):
-        idx = i * step
-        bin_str += str(flat[idx] & 1)
-
-    # Convert back to hex
-    hex_str = ''.join(format(int(bin_str[i:i+4], 2), 'x') for i in range(0, len(bin_str), 4))
-    return hex_str[:length]
+def decode_watermark_fast(image: Image.Image, length=64) -> str:
+    """
+    Same result as decode_watermark, but only decodes the parts of a freshly
+    opened image that hold watermark bits.
+    """
+    return bits_to_hash(fast_extract_bits(image, length * 4), length)
 
 
 def save_watermark(wm_hash, prompt):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("INSERT OR IGNORE INTO watermarks (hash, prompt) VALUES (?, ?)", (wm_hash, prompt))
-    conn.commit()
-    conn.close()
+    registry.save_watermark(wm_hash, prompt)
 
 def get_prompt_by_hash(wm_hash):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT prompt FROM watermarks WHERE hash=?", (wm_hash,))
-    row = c.fetchone()
-    conn.close()
-    return row[0] if row else None
-
-from PIL import ImageDraw
+    return registry.get_prompt_by_hash(wm_hash)
+
+def stamp_image(image: Image.Image, prompt: str) -> Image.Image:
+    """Watermark an image for a prompt and record it in the registry."""
+    wm_hash = generate_hash(prompt)
+    stamped = encode_watermark(image, wm_hash)
+    save_watermark(wm_hash, prompt)
+    return stamped
+
+def stamp_image_stream(image: Image.Image, prompt: str):
+    """Streaming variant of stamp_image: returns an iterator of PNG chunks."""
+    wm_hash = generate_hash(prompt)
+    chunks = iter_encoded_png(image, wm_hash)
+    save_watermark(wm_hash, prompt)
+    return chunks
+
+def png_chunks_to_data_uri(chunks) -> str:
+    """Base64-encode PNG chunks incrementally into a data URI."""
+    parts = ["data:image/png;base64,"]
+    carry = b""
+    for chunk in chunks:
+        chunk = carry + chunk
+        cut = len(chunk) - len(chunk) % 3
+        parts.append(base64.b64encode(chunk[:cut]).decode())
+        carry = chunk[cut:]
+    parts.append(base64.b64encode(carry).decode())
+    return "".join(parts)
 
 def highlight_watermark_pixels(image: Image.Image, length=64) -> Image.Image:
     """
     Highlight watermark pixels across the whole image, matching the evenly-distributed encoding.
     """
     arr = np.array(image.convert("RGBA"), dtype=np.uint8)
-    h, w, _ = arr.shape
-    flat = arr[:, :, :3].flatten()
+    mark_set_bits(arr, extract_bits(arr, length * 4))
+    return Image.fromarray(arr, 'RGBA')
 
-    total_bits = length * 4
-    step = len(flat) // total_bits
+class VerificationPipeline:
+    """
+    Verify a single uploaded image. The upload is converted to one RGBA array
+    which is shared by hash extraction, registry lookup and highlighting.
+    """
 
-    marked_pixels = []
-    for i in range(total_bits):
-        idx = i * step
-        if flat[idx] & 1:
-            pixel_idx = idx // 3
-            y = pixel_idx // w
-            x = pixel_idx % w
-            marked_pixels.append((x, y))
+    def __init__(self, image: Image.Image, length=64):
+        self.arr = np.array(image.convert("RGBA"), dtype=np.uint8)
+        self.bits = extract_bits(self.arr, length * 4)
+        self.extracted_hash = bits_to_hash(self.bits, length)
+        self.prompt = None
 
-    highlighted_image = image.convert("RGBA")
-    draw = ImageDraw.Draw(highlighted_image)
-    square_size = 8  # bigger squares for visibility
+    def lookup(self):
+        self.prompt = get_prompt_by_hash(self.extracted_hash)
+        return self.prompt
 
-    for x, y in marked_pixels:
-        top_left = (max(x - square_size//2, 0), max(y - square_size//2, 0))
-        bottom_right = (min(x + square_size//2, w-1), min(y + square_size//2, h-1))
-        draw.rectangle([top_left, bottom_right], fill=(255,0,0,180))  # semi-transparent red
+    def highlight(self) -> Image.Image:
+        """Draw the watermark markers straight into the shared buffer."""
+        mark_set_bits(self.arr, self.bits)
+        return Image.fromarray(self.arr, 'RGBA')
 
-    return highlighted_image
+    def highlighted_data_uri(self) -> str:
+        buf = io.BytesIO()
+        self.highlight().save(buf, format="PNG")
+        img_data = base64.b64encode(buf.getvalue()).decode()
+        return f"data:image/png;base64,{img_data}"
 
 # --- Image Generation Functions (from app.py) ---
 def is_image_request(message: str) -> bool:
@@ -237,76 +248,61 @@ def generate_demo_image(prompt: str):
         img = Image.new('RGB', (512, 512), color=color)
         return img
 
-def generate_image(prompt: str):
+def generate_model_image(prompt: str):
+    """Hedged fan-out over the models, fastest healthy one first; None if all fail."""
     if not HF_TOKEN:
-        return generate_demo_image(prompt)
-
-    # Try multiple models in order of preference
-    models = [
-        "runwayml/stable-diffusion-v1-5",
-        "CompVis/stable-diffusion-v1-4",
-        "stabilityai/stable-diffusion-2-1-base",
-        "black-forest-labs/FLUX.1-schnell"
-    ]
-
-    for model in models:
-        API_URL = f"https://api-inference.huggingface.co/models/{model}"
-        headers = {"Authorization": f"Bearer {HF_TOKEN}"}
-
-        if "FLUX" in model:
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "guidance_scale": 7.5,
-                    "num_inference_steps": 4,
-                    "width": 1024,
-                    "height": 1024
-                }
-            }
-        else:
-            payload = {"inputs": prompt}
+        return None
+    return inference.generate_image(prompt, HF_TOKEN, timeout=30)
 
-        try:
-            r = requests.post(API_URL, headers=headers, json=payload, timeout=30)
-            if r.status_code == 200:
-                try:
-                    return Image.open(io.BytesIO(r.content))
-                except Exception:
-                    continue
-            elif r.status_code == 503:
-                # Model is loading, try next one
-                continue
-            else:
-                # Check if it's a permissions error
-                try:
-                    error_data = r.json()
-                    if "permissions" in error_data.get("error", "").lower():
-                        continue
-                except:
-                    continue
-        except Exception:
-            continue
+def generate_image(prompt: str):
+    image = generate_model_image(prompt)
+    if image is not None:
+        return image
 
     # If all models fail, use demo mode
     return generate_demo_image(prompt)
 
 def process_image_with_watermark(image: Image.Image, prompt: str):
     try:
-        wm_hash = generate_hash(prompt)
-        watermarked_img = encode_watermark(image, wm_hash)
-        save_watermark(wm_hash, prompt)
-
-        buf = io.BytesIO()
-        watermarked_img.save(buf, format="PNG")
-        buf.seek(0)
-        img_data = base64.b64encode(buf.getvalue()).decode()
-        return f"data:image/png;base64,{img_data}"
+        return png_chunks_to_data_uri(stamp_image_stream(image, prompt))
     except Exception:
         return None
 
+def image_payload(prompt: str, image_data: str):
+    return {
+        "type": "image",
+        "content": f"Here's your image: \"{prompt}\"",
+        "image": image_data
+    }
+
+def run_generation_job(prompt: str):
+    """Background job for /chat: generate, watermark and return the chat payload."""
+    image = generate_model_image(prompt)
+    generated = image is not None
+    if not generated:
+        image = generate_demo_image(prompt)
+    if not image:
+        return {
+            "type": "text",
+            "content": "❌ Image generation failed. Please try again."
+        }
+
+    # Add watermark
+    watermarked_image_data = process_image_with_watermark(image, prompt)
+    if not watermarked_image_data:
+        return {
+            "type": "text",
+            "content": "❌ Failed to add watermark. Please try again."
+        }
+
+    # Only real model output is worth serving again; demo placeholders are not cached
+    if generated:
+        image_cache.put(image_cache.key(prompt, inference.MODELS), watermarked_image_data)
+    return image_payload(prompt, watermarked_image_data)
+
 def detect_watermark_in_image(image: Image.Image):
     try:
-        extracted_hash = decode_watermark(image)
+        extracted_hash = decode_watermark_fast(image)
         prompt = get_prompt_by_hash(extracted_hash)
         if prompt:
             return f"✅ This image was generated by AI with the prompt: '{prompt}'"
@@ -358,27 +354,20 @@ def chat():
         try:
             prompt = clean_prompt(message)
 
-            # Generate image
-            image = generate_image(prompt)
-            if not image:
-                return jsonify({
-                    "type": "text",
-                    "content": "❌ Image generation failed. Please try again."
-                })
-
-            # Add watermark
-            watermarked_image_data = process_image_with_watermark(image, prompt)
-            if not watermarked_image_data:
-                return jsonify({
-                    "type": "text",
-                    "content": "❌ Failed to add watermark. Please try again."
-                })
+            # Same prompt and models as an earlier request: reuse its watermarked image
+            cached = image_cache.get(image_cache.key(prompt, inference.MODELS))
+            if cached:
+                return jsonify(image_payload(prompt, cached))
 
+            # Generate in the background so this worker isn't held by upstream latency
+            job_id = jobs.submit(run_generation_job, prompt)
             return jsonify({
-                "type": "image",
-                "content": f"Here's your image: \"{prompt}\"",
-                "image": watermarked_image_data
-            })
+                "type": "job",
+                "content": f"🎨 Generating \"{prompt}\"…",
+                "job_id": job_id,
+                "status_url": f"/jobs/{job_id}",
+                "events_url": f"/jobs/{job_id}/events"
+            }), 202
 
         except Exception as e:
             return jsonify({
@@ -403,6 +392,56 @@ def chat():
         "content": response
     })
 
+@app.route("/model_stats", methods=["GET"])
+def model_stats():
+    """Return per-model latency percentiles and circuit-breaker state."""
+    return jsonify(inference.model_stats())
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """Poll a generation job; "result" holds the chat payload once it is done or failed."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job)
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """
+    Stream a generation job's status changes as server-sent events. Quiet
+    streams get a comment line every JOB_EVENTS_HEARTBEAT seconds so proxies
+    keep them open; after JOB_EVENTS_MAX_WAIT a "timeout" event ends the
+    stream and the client can reconnect or poll.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    def generate():
+        current, last_status = job, None
+        deadline = time.monotonic() + JOB_EVENTS_MAX_WAIT
+        last_sent = time.monotonic()
+        while True:
+            if current is None:
+                yield 'event: error\ndata: {"error": "Unknown job"}\n\n'
+                return
+            if current["status"] != last_status:
+                last_status = current["status"]
+                last_sent = time.monotonic()
+                yield f"event: status\ndata: {json.dumps(current)}\n\n"
+            if last_status in (DONE, FAILED):
+                return
+            if time.monotonic() >= deadline:
+                yield f"event: timeout\ndata: {json.dumps({'id': job_id, 'status_url': f'/jobs/{job_id}'})}\n\n"
+                return
+            if time.monotonic() - last_sent >= JOB_EVENTS_HEARTBEAT:
+                last_sent = time.monotonic()
+                yield ": heartbeat\n\n"
+            time.sleep(JOB_POLL_INTERVAL)
+            current = jobs.get(job_id)
+
+    return Response(generate(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.route("/encode", methods=["POST"])
 def encode():
     prompt = request.form["prompt"]
@@ -410,9 +449,13 @@ def encode():
     image = Image.open(file.stream)
 
     try:
-        wm_hash = generate_hash(prompt)
-        stamped = encode_watermark(image, wm_hash)
-        save_watermark(wm_hash, prompt)
+        # Large uploads are encoded band by band and streamed straight out
+        w, h = image.size
+        if request.form.get("stream") == "1" or w * h >= STREAM_MIN_PIXELS:
+            return Response(stamp_image_stream(image, prompt), mimetype="image/png",
+                            headers={"Content-Disposition": "attachment; filename=encoded.png"})
+
+        stamped = stamp_image(image, prompt)
 
         buf = io.BytesIO()
         stamped.save(buf, format="PNG")
@@ -421,7 +464,80 @@ def encode():
     except Exception as e:
         return render_template("index.html", result=f"❌ Failed to encode: {str(e)}")
 
-@app.route("/verify", methods=["POST"])
+class ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink that lets zipfile emit an archive in chunks."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def encode_upload(data: bytes, wm_hash: str) -> bytes:
+    buf = io.BytesIO()
+    encode_watermark(Image.open(io.BytesIO(data)), wm_hash).save(buf, format="PNG")
+    return buf.getvalue()
+
+@app.route("/encode/batch", methods=["POST"])
+def encode_batch():
+    """
+    Stamp many images in one call. `prompts` and `files` are paired by order.
+    Streams back a zip of encoded PNGs plus a manifest.json.
+    """
+    prompts = request.form.getlist("prompts")
+    files = request.files.getlist("files")
+    if not files:
+        return jsonify({"error": "No images provided"}), 400
+    if len(prompts) != len(files):
+        return jsonify({"error": f"Got {len(prompts)} prompts for {len(files)} images"}), 400
+
+    uploads = []
+    for i, (prompt, f) in enumerate(zip(prompts, files)):
+        stem = os.path.splitext(os.path.basename(f.filename or "image"))[0]
+        uploads.append((f"{i:05d}_{stem}_encoded.png", prompt, generate_hash(prompt), f.read()))
+
+    # The hash depends only on the prompt, so every row can be registered up
+    # front in one transaction before any image leaves the server.
+    registry.save_watermarks((wm_hash, prompt) for _, prompt, wm_hash, _ in uploads)
+
+    def generate():
+        sink = ZipStream()
+        manifest = []
+        window = deque()
+        pending = iter(uploads)
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+            while True:
+                # Keep a bounded number of encodes in flight so memory stays flat
+                while len(window) < BATCH_WORKERS * 2:
+                    upload = next(pending, None)
+                    if upload is None:
+                        break
+                    window.append((upload, batch_executor.submit(encode_upload, upload[3], upload[2])))
+                if not window:
+                    break
+                (name, prompt, wm_hash, _), future = window.popleft()
+                entry = {"name": name, "prompt": prompt, "hash": wm_hash}
+                try:
+                    zf.writestr(name, future.result())
+                except Exception as e:
+                    entry["error"] = f"Failed to encode: {str(e)}"
+                manifest.append(entry)
+                yield sink.drain()
+            zf.writestr("manifest.json", json.dumps(manifest, indent=2))
+        yield sink.drain()
+
+    return Response(generate(), mimetype="application/zip",
+                    headers={"Content-Disposition": "attachment; filename=encoded.zip"})
+
 @app.route("/verify", methods=["POST"])
 def verify():
     file = request.files["file"]
@@ -429,19 +545,12 @@ def verify():
 
     highlighted_image = None
     try:
-        extracted_hash = decode_watermark(image)
-        prompt = get_prompt_by_hash(extracted_hash)
+        pipeline = VerificationPipeline(image)
+        prompt = pipeline.lookup()
         if prompt:
             result = f"✅ Watermark detected! Original prompt: '{prompt}'"
-            # Generate highlighted image
-            highlighted_image = highlight_watermark_pixels(image)
-            # Convert to base64 for HTML embedding
-            buf = io.BytesIO()
-            highlighted_image.save(buf, format="PNG")
-            buf.seek(0)
-            import base64
-            img_data = base64.b64encode(buf.getvalue()).decode()
-            highlighted_image = f"data:image/png;base64,{img_data}"
+            # Highlighted image for HTML embedding
+            highlighted_image = pipeline.highlighted_data_uri()
         else:
             result = "❌ No watermark detected."
     except Exception as e:
@@ -449,6 +558,81 @@ def verify():
 
     return render_template("index.html", result=result, highlighted_image=highlighted_image)
 
+class UploadTooLarge(ValueError):
+    pass
+
+def read_batch_uploads():
+    """
+    Collect (name, bytes) pairs from multipart `files` and any `archive` zips.
+    Raises UploadTooLarge past BATCH_MAX_FILES images, or when a zip member
+    or all members together would decompress past the byte limits.
+    """
+    uploads = [(f.filename, f.read()) for f in request.files.getlist("files")]
+    total = sum(len(data) for _, data in uploads)
+    for archive in request.files.getlist("archive"):
+        with zipfile.ZipFile(archive.stream) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                    continue
+                if len(uploads) >= BATCH_MAX_FILES:
+                    raise UploadTooLarge(f"More than {BATCH_MAX_FILES} images")
+                if info.file_size > BATCH_MAX_FILE_BYTES:
+                    raise UploadTooLarge(f"{info.filename} is larger than {BATCH_MAX_FILE_BYTES} bytes")
+                # file_size comes from the archive itself, so cap the actual read too
+                with zf.open(info) as member:
+                    data = member.read(BATCH_MAX_FILE_BYTES + 1)
+                if len(data) > BATCH_MAX_FILE_BYTES:
+                    raise UploadTooLarge(f"{info.filename} is larger than {BATCH_MAX_FILE_BYTES} bytes")
+                total += len(data)
+                if total > BATCH_MAX_TOTAL_BYTES:
+                    raise UploadTooLarge(f"Archive contents exceed {BATCH_MAX_TOTAL_BYTES} bytes")
+                uploads.append((info.filename, data))
+    if len(uploads) > BATCH_MAX_FILES:
+        raise UploadTooLarge(f"More than {BATCH_MAX_FILES} images")
+    return uploads
+
+def extract_upload_hash(data: bytes) -> str:
+    return decode_watermark_fast(Image.open(io.BytesIO(data)))
+
+@app.route("/verify/batch", methods=["POST"])
+def verify_batch():
+    """Verify many images (multipart `files` and/or zip `archive`) and return JSON."""
+    try:
+        uploads = read_batch_uploads()
+    except zipfile.BadZipFile as e:
+        return jsonify({"error": f"Invalid archive: {str(e)}"}), 400
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    if not uploads:
+        return jsonify({"error": "No images provided"}), 400
+
+    futures = [batch_executor.submit(extract_upload_hash, data) for _, data in uploads]
+    extracted = []
+    for (name, _), future in zip(uploads, futures):
+        try:
+            extracted.append((name, future.result(), None))
+        except Exception as e:
+            extracted.append((name, None, str(e)))
+
+    prompts = registry.get_prompts_by_hashes([h for _, h, _ in extracted if h])
+    results = []
+    for name, wm_hash, error in extracted:
+        if error:
+            results.append({"name": name, "watermarked": False, "error": f"Failed to decode watermark: {error}"})
+            continue
+        prompt = prompts.get(wm_hash)
+        if prompt:
+            results.append({"name": name, "watermarked": True, "hash": wm_hash, "prompt": prompt})
+        else:
+            results.append({"name": name, "watermarked": False})
+
+    return jsonify({"count": len(results), "results": results})
+
+@app.route("/cache_stats", methods=["GET"])
+def cache_stats():
+    """Return hit/miss/eviction counters of the watermark lookup and image caches."""
+    return jsonify(dict(registry.cache.stats(), images=image_cache.stats()))
+
 # Static facts as fallback if API fails
 FALLBACK_STATS = [
     "91% of people can't distinguish between deepfake videos and real ones after just a few seconds of viewing.",
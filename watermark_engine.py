@@ -0,0 +1,208 @@
+import struct
+import zlib
+
+import numpy as np
+
+# Watermark layout: the hash bits are spread evenly over the RGB samples of the
+# image in row-major (y, x, channel) order, one bit per LSB at a fixed stride.
+
+
+def hash_to_bits(wm_hash: str) -> np.ndarray:
+    """
+    Unpack a hex hash into a uint8 array of bits (MSB first per hex digit).
+    """
+    padded = wm_hash + "0" * (len(wm_hash) % 2)
+    bits = np.unpackbits(np.frombuffer(bytes.fromhex(padded), dtype=np.uint8))
+    return bits[:len(wm_hash) * 4]
+
+
+def bits_to_hash(bits: np.ndarray, length: int) -> str:
+    """
+    Pack a bit array back into a hex string of `length` digits.
+    """
+    return np.packbits(bits.astype(np.uint8)).tobytes().hex()[:length]
+
+
+def watermark_positions(h: int, w: int, n_bits: int):
+    """
+    Return (rows, cols, channels) index arrays of every watermark bit in an
+    h x w RGB(A) image, matching the stride used by the flat encoder.
+    """
+    total = h * w * 3
+    step = total // n_bits
+    flat_idx = np.arange(n_bits, dtype=np.int64) * step
+    rows, rem = np.divmod(flat_idx, w * 3)
+    cols, chans = np.divmod(rem, 3)
+    return rows, cols, chans
+
+
+def embed_bits(arr: np.ndarray, bits: np.ndarray) -> np.ndarray:
+    """
+    Write `bits` into the LSBs of `arr` (h x w x 3+ uint8) in place.
+    """
+    h, w = arr.shape[:2]
+    if len(bits) > h * w * 3:
+        raise ValueError("Image too small for watermark!")
+    rows, cols, chans = watermark_positions(h, w, len(bits))
+    arr[rows, cols, chans] = (arr[rows, cols, chans] & 0b11111110) | bits
+    return arr
+
+
+def extract_bits(arr: np.ndarray, n_bits: int) -> np.ndarray:
+    """
+    Read `n_bits` watermark LSBs from `arr` (h x w x 3+ uint8).
+    """
+    h, w = arr.shape[:2]
+    rows, cols, chans = watermark_positions(h, w, n_bits)
+    return arr[rows, cols, chans] & 1
+
+
+def mark_set_bits(arr: np.ndarray, bits: np.ndarray, square_size=8, color=(255, 0, 0, 180)) -> np.ndarray:
+    """
+    Paint a square over every watermark position whose bit is set, in place.
+    """
+    h, w = arr.shape[:2]
+    rows, cols, _ = watermark_positions(h, w, len(bits))
+    half = square_size // 2
+    fill = np.array(color[:arr.shape[2]], dtype=np.uint8)
+    for y, x in zip(rows[bits == 1], cols[bits == 1]):
+        arr[max(y - half, 0):min(y + half, h - 1) + 1, max(x - half, 0):min(x + half, w - 1) + 1] = fill
+    return arr
+
+
+# --- Partial decoding ---
+# rawmode -> (bytes per pixel, byte offset of R, G, B within a pixel)
+RAW_LAYOUTS = {
+    "RGB": (3, (0, 1, 2)),
+    "BGR": (3, (2, 1, 0)),
+    "RGBA": (4, (0, 1, 2)),
+    "RGBX": (4, (0, 1, 2)),
+    "BGRA": (4, (2, 1, 0)),
+    "BGRX": (4, (2, 1, 0)),
+}
+
+
+def _sample_raw(image, rows, cols, chans):
+    """
+    Read samples straight out of an uncompressed file through a memory map,
+    touching only the pages that hold watermark pixels. None if unsupported.
+    """
+    if len(image.tile) != 1:
+        return None
+    codec, extents, offset, args = image.tile[0]
+    rawmode, stride, orientation = (args, 0, 1) if isinstance(args, str) else (tuple(args) + (0, 1))[:3]
+    w, h = image.size
+    if codec != "raw" or tuple(extents) != (0, 0, w, h) or rawmode not in RAW_LAYOUTS:
+        return None
+    bpp, rgb = RAW_LAYOUTS[rawmode]
+    stride = stride or w * bpp
+
+    fp = image.fp
+    if hasattr(fp, "getbuffer"):
+        data = np.frombuffer(fp.getbuffer(), dtype=np.uint8)
+    elif getattr(image, "filename", None):
+        data = np.memmap(image.filename, dtype=np.uint8, mode="r")
+    else:
+        data = np.memmap(fp, dtype=np.uint8, mode="r")
+    if len(data) < offset + stride * h:
+        return None
+
+    file_rows = rows if orientation >= 0 else h - 1 - rows
+    return data[offset + file_rows * stride + cols * bpp + np.take(rgb, chans)]
+
+
+def fast_extract_bits(image, n_bits: int) -> np.ndarray:
+    """
+    Read watermark LSBs from a freshly opened (not yet loaded) image while
+    decoding as little of it as possible:
+
+    - uncompressed formats (BMP, PPM, TGA, raw TIFF) are memory-mapped and
+      only the sampled pixels are read;
+    - other RGB/RGBA images (e.g. PNG) are decoded natively and sampled in
+      place, skipping the RGBA conversion and full-array copy.
+
+    Anything else falls back to the regular conversion.
+    """
+    w, h = image.size
+    rows, cols, chans = watermark_positions(h, w, n_bits)
+    if image.mode not in ("RGB", "RGBA"):
+        return extract_bits(np.array(image.convert("RGBA"), dtype=np.uint8), n_bits)
+
+    try:
+        samples = _sample_raw(image, rows, cols, chans)
+    except (OSError, ValueError):
+        samples = None
+    if samples is not None:
+        return samples & 1
+
+    image.load()
+    return np.fromiter((image.getpixel((int(x), int(y)))[c] & 1 for y, x, c in zip(rows, cols, chans)),
+                       dtype=np.uint8, count=n_bits)
+
+# --- Streaming PNG encoder ---
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+
+def _paeth_filter(band: np.ndarray, prev_row: np.ndarray) -> np.ndarray:
+    """
+    Apply PNG filter type 4 (Paeth) to a band of RGBA scanlines (rows x w*4).
+    Encoding only looks at unfiltered neighbours, so it vectorizes cleanly.
+    """
+    cur = band.astype(np.int16)
+    up = np.vstack([prev_row[None, :], band[:-1]]).astype(np.int16)
+    left = np.zeros_like(cur)
+    left[:, 4:] = cur[:, :-4]
+    up_left = np.zeros_like(cur)
+    up_left[:, 4:] = up[:, :-4]
+
+    pa = np.abs(up - up_left)
+    pb = np.abs(left - up_left)
+    pc = np.abs(left + up - 2 * up_left)
+    pred = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+
+    out = np.empty((band.shape[0], band.shape[1] + 1), dtype=np.uint8)
+    out[:, 0] = 4
+    out[:, 1:] = (cur - pred).astype(np.uint8)
+    return out
+
+
+def iter_encoded_png(image, wm_hash: str, band_rows=64, compress_level=6):
+    """
+    Watermark `image` and return an iterator of PNG byte chunks.
+
+    The image is converted to RGBA one band of rows at a time and watermark
+    bits are only written into bands that contain bit positions, so memory
+    beyond the decoded source stays proportional to the band, not the image.
+    Size checks run eagerly so errors surface before any bytes are sent.
+    """
+    w, h = image.size
+    bits = hash_to_bits(wm_hash)
+    if len(bits) > h * w * 3:
+        raise ValueError("Image too small for watermark!")
+    rows, cols, chans = watermark_positions(h, w, len(bits))
+    # Decode now: an upload's stream may already be closed once streaming starts
+    image.load()
+
+    def chunks():
+        yield PNG_SIGNATURE + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0))
+        compressor = zlib.compressobj(compress_level)
+        prev_row = np.zeros(w * 4, dtype=np.uint8)
+        for y0 in range(0, h, band_rows):
+            y1 = min(y0 + band_rows, h)
+            band = np.array(image.crop((0, y0, w, y1)).convert("RGBA"), dtype=np.uint8)
+            in_band = (rows >= y0) & (rows < y1)
+            if in_band.any():
+                r, c, ch = rows[in_band] - y0, cols[in_band], chans[in_band]
+                band[r, c, ch] = (band[r, c, ch] & 0b11111110) | bits[in_band]
+            scanlines = band.reshape(y1 - y0, w * 4)
+            data = compressor.compress(_paeth_filter(scanlines, prev_row))
+            prev_row = scanlines[-1].copy()
+            if data:
+                yield _png_chunk(b"IDAT", data)
+        yield _png_chunk(b"IDAT", compressor.flush()) + _png_chunk(b"IEND", b"")
+
+    return chunks()